@@ -2,8 +2,27 @@ import bpy
 import os
 import sys
 import json
+import argparse
+import numpy as np
 
 script_dir = os.path.dirname(os.path.realpath(__file__))
+if script_dir not in sys.path:
+    sys.path.append(script_dir)
+
+from bake_utils import (
+    atlas_uvs,
+    bytes_digest,
+    fetch_cached_bake,
+    file_digest,
+    linear_to_srgb,
+    load_atlas_layout,
+    new_bake_key,
+    store_bake,
+    transfer_texture,
+    update_array,
+    update_json,
+)
+
 json_path = os.path.join(script_dir, "data.json")
 
 with open(json_path, "r") as f:
@@ -17,46 +36,400 @@ bake_res = data.get("bake_res")
 island_margin = data.get("island_margin")
 bake_margin = data.get("bake_margin")
 samples = data.get("samples")
+# "snapshot" undoes each mesh's UV/material/image changes in memory; "reload" reopens the .blend as before
+restore_mode = data.get("restore_mode", "snapshot")
+# Finished bakes keyed by geometry, UVs, node graphs, source images and bake settings; unset disables the cache
+bake_cache_dir = data.get("bake_cache_dir")
+bake_cache_link = data.get("bake_cache_link", False)  # Hard link cache hits instead of copying them
+# Resample single-image/flat-color materials onto the new UVs with NumPy; other meshes still bake in Cycles
+fast_diffuse_transfer = data.get("fast_diffuse_transfer", False)
+# Layout from plan_atlases.py; meshes listed in it are baked into shared atlases
+atlas_layout_path = data.get("atlas_layout_path")
+
+# Arguments after "--", passed by the bake farm in execute_in_blender.py:
+#   --mesh-list shard.json  bake only the mesh names in this JSON list
+#   --device CPU            bake on the CPU (threads come from Blender's -t)
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+parser = argparse.ArgumentParser(prog="bake_single_texture.py")
+parser.add_argument("--mesh-list")
+parser.add_argument("--device", choices=["GPU", "CPU"], default="GPU")
+args = parser.parse_args(argv)
+
+if args.mesh_list:
+    with open(args.mesh_list, "r") as f:
+        mesh_names = json.load(f)
+cycles_device = args.device
+
+
+# Node properties that only affect the editor, left out of the cache key
+UI_PROPERTIES = {
+    "name", "label", "location", "width", "width_hidden", "height", "dimensions", "select", "hide",
+    "mute_ui", "show_options", "show_preview", "show_texture", "use_custom_color", "color", "parent"
+}
+VALUE_TYPES = {"BOOLEAN", "INT", "FLOAT", "STRING", "ENUM"}
+# Modifier properties that only affect the viewport or editor; show_render is kept
+MODIFIER_UI_PROPERTIES = {"show_viewport", "show_in_editmode", "show_on_cage", "show_expanded", "is_active", "use_pin_to_last"}
+
+
+def plain_value(value):
+    """RNA value as something json can hash deterministically."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if hasattr(value, "__len__") and not isinstance(value, str):
+        return [plain_value(v) for v in value]
+    return value
+
+
+def image_state(img):
+    """Identity of an image by content: file or packed data hash, else its generator settings."""
+    if img is None:
+        return None
+
+    if img.packed_file:
+        digest = bytes_digest(bytes(img.packed_file.data))
+    elif img.source in {'FILE', 'SEQUENCE', 'TILED'}:
+        digest = file_digest(bpy.path.abspath(img.filepath, library=img.library)) or img.filepath
+    else:
+        digest = [img.generated_type, img.generated_width, img.generated_height, list(img.generated_color)]
+
+    return {"digest": digest, "colorspace": img.colorspace_settings.name, "alpha_mode": img.alpha_mode}
+
+
+def node_tree_state(tree, seen):
+    """Nodes (settings, unlinked inputs, output values, images, nested groups) and links of a node tree."""
+    if tree is None:
+        return None
+    if tree.name in seen:
+        return tree.name
+    seen.add(tree.name)
+
+    nodes = []
+    for node in sorted(tree.nodes, key=lambda n: n.name):
+        values = {
+            prop.identifier: plain_value(getattr(node, prop.identifier))
+            for prop in node.bl_rna.properties
+            if not prop.is_readonly and prop.type in VALUE_TYPES and prop.identifier not in UI_PROPERTIES
+        }
+        inputs = {
+            socket.identifier: plain_value(socket.default_value)
+            for socket in node.inputs
+            if not socket.is_linked and hasattr(socket, "default_value")
+        }
+        # RGB and Value nodes keep their value on the output socket
+        outputs = {
+            socket.identifier: plain_value(socket.default_value)
+            for socket in node.outputs
+            if hasattr(socket, "default_value")
+        }
+        state = {"name": node.name, "type": node.bl_idname, "values": values, "inputs": inputs, "outputs": outputs}
+
+        if getattr(node, "image", None) is not None:
+            state["image"] = image_state(node.image)
+        if getattr(node, "node_tree", None) is not None:
+            state["group"] = node_tree_state(node.node_tree, seen)
+        if getattr(node, "color_ramp", None) is not None:
+            state["ramp"] = [(e.position, list(e.color)) for e in node.color_ramp.elements]
+        if getattr(node, "mapping", None) is not None and hasattr(node.mapping, "curves"):
+            state["curves"] = [[tuple(p.location) for p in curve.points] for curve in node.mapping.curves]
+        nodes.append(state)
+
+    links = sorted(
+        (link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+        for link in tree.links
+    )
+    return {"nodes": nodes, "links": links}
+
+
+def id_state(value, seen):
+    """A datablock a modifier points at: images, textures and node groups by content, objects by transform and mesh."""
+    if value is None:
+        return None
+    if isinstance(value, bpy.types.Image):
+        return image_state(value)
+    if isinstance(value, bpy.types.NodeTree):
+        return node_tree_state(value, seen)
+    if isinstance(value, bpy.types.Texture):
+        return {"name": value.name, "type": value.type, "image": image_state(getattr(value, "image", None))}
+    if isinstance(value, bpy.types.Object):
+        state = {"name": value.name, "matrix_world": plain_value(value.matrix_world)}
+        if value.type == 'MESH':
+            co = np.empty(len(value.data.vertices) * 3, dtype=np.float32)
+            value.data.vertices.foreach_get("co", co)
+            state["vertices"] = bytes_digest(co.tobytes())
+        return state
+    return getattr(value, "name", str(value))
+
+
+def modifier_state(mod, seen):
+    """Type, settings and referenced datablocks of a modifier; Cycles bakes the mesh after the stack."""
+    values = {}
+    for prop in mod.bl_rna.properties:
+        if prop.is_readonly or prop.identifier in UI_PROPERTIES or prop.identifier in MODIFIER_UI_PROPERTIES:
+            continue
+        if prop.type in VALUE_TYPES:
+            values[prop.identifier] = plain_value(getattr(mod, prop.identifier))
+        elif prop.type == 'POINTER':
+            values[prop.identifier] = id_state(getattr(mod, prop.identifier), seen)
+
+    # Geometry Nodes inputs are ID properties on the modifier
+    inputs = {
+        key: id_state(mod[key], seen) if isinstance(mod[key], bpy.types.ID) else plain_value(mod[key])
+        for key in mod.keys()
+    }
+    return {"type": mod.type, "values": values, "inputs": inputs}
+
+
+def bake_cache_key(obj):
+    """Hash of everything the bake of obj depends on."""
+    mesh = obj.data
+    h = new_bake_key()
+
+    counts = {"vertices": 3, "loops": 1, "polygons": 1}
+    for name, attr, dtype in (
+        ("vertices", "co", np.float32),
+        ("loops", "vertex_index", np.int32),
+        ("polygons", "loop_total", np.int32),
+        ("polygons", "material_index", np.int32),
+    ):
+        items = getattr(mesh, name)
+        values = np.empty(len(items) * counts[name], dtype=dtype)
+        items.foreach_get(attr, values)
+        update_array(h, values)
+
+    for layer in mesh.uv_layers:
+        uv = np.empty(len(layer.data) * 2, dtype=np.float32)
+        layer.data.foreach_get("uv", uv)
+        update_json(h, layer.name)
+        update_array(h, uv)
+
+    update_array(h, np.array(obj.matrix_world, dtype=np.float32))
+
+    # obj.data is the mesh before modifiers; the bake sees the evaluated one
+    seen = set()
+    update_json(h, [modifier_state(mod, seen) for mod in obj.modifiers])
+
+    materials = []
+    for slot in obj.material_slots:
+        mat = slot.material
+        if mat is None:
+            materials.append(None)
+        elif mat.use_nodes and mat.node_tree:
+            materials.append(node_tree_state(mat.node_tree, set()))
+        else:
+            materials.append({"diffuse_color": list(mat.diffuse_color)})
+    update_json(h, materials)
+
+    update_json(h, {
+        "bake_res": bake_res,
+        "island_margin": island_margin,
+        "bake_margin": bake_margin,
+        "samples": samples,
+        "fast_diffuse_transfer": fast_diffuse_transfer,
+    })
+    return h.hexdigest()
+
+
+_image_pixels = {}  # Image name -> (H, W, C) pixels, shared by every mesh using the image
+
+
+def image_pixels(img):
+    pixels = _image_pixels.get(img.name)
+    if pixels is None:
+        width, height = img.size
+        pixels = np.empty(width * height * img.channels, dtype=np.float32)
+        img.pixels.foreach_get(pixels)
+        pixels = _image_pixels[img.name] = pixels.reshape(height, width, img.channels)
+    return pixels
+
+
+def linked_from(socket):
+    return socket.links[0].from_node if socket.is_linked else None
+
+
+def diffuse_source(mat):
+    """
+    What a DIFFUSE/COLOR bake of mat would produce, if it is simple enough
+    to resample without Cycles: {"color": sRGB} for a flat color, or
+    {"pixels", "extension"} for a single sRGB byte image feeding the
+    BSDF color. Returns None for anything else.
+    """
+    if not mat or not mat.use_nodes or not mat.node_tree:
+        return None
+
+    nodes = mat.node_tree.nodes
+    output = next((n for n in nodes if n.type == 'OUTPUT_MATERIAL' and n.is_active_output), None)
+    bsdf = linked_from(output.inputs["Surface"]) if output else None
+    if bsdf is None or bsdf.type not in {'BSDF_PRINCIPLED', 'BSDF_DIFFUSE'}:
+        return None
+
+    # Metal and transmission take their share out of the diffuse color
+    for name in ("Metallic", "Transmission Weight", "Transmission"):
+        socket = bsdf.inputs.get(name)
+        if socket and (socket.is_linked or socket.default_value != 0):
+            return None
+
+    color = bsdf.inputs["Base Color" if bsdf.type == 'BSDF_PRINCIPLED' else "Color"]
+    tex_nodes = [n for n in nodes if n.type == 'TEX_IMAGE']
+    if not color.is_linked:
+        return {"color": linear_to_srgb(color.default_value[:3])} if not tex_nodes else None
+
+    tex = linked_from(color)
+    if (
+        len(tex_nodes) != 1 or tex is not tex_nodes[0]
+        or color.links[0].from_socket.name != "Color"
+        or tex.inputs["Vector"].is_linked
+        or tex.interpolation != 'Linear'
+        or tex.extension not in {'REPEAT', 'EXTEND'}
+        or tex.image is None or tex.image.is_float
+        or tex.image.colorspace_settings.name != 'sRGB'
+        or 0 in tuple(tex.image.size) or tex.image.channels < 3
+    ):
+        return None
+
+    return {"pixels": image_pixels(tex.image), "extension": tex.extension}
+
+
+def transfer_diffuse(obj, img, uv_name, old_uv_name):
+    """
+    Fill img from the old UV layer with transfer_texture() when every
+    material on obj passes diffuse_source(). Returns False (img untouched)
+    when the mesh needs a Cycles bake.
+    """
+    mesh = obj.data
+    old_layer = mesh.uv_layers.get(old_uv_name)
+    if old_layer is None:
+        return False
+
+    mesh.calc_loop_triangles()
+    tri_count = len(mesh.loop_triangles)
+    loops = np.empty(tri_count * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("loops", loops)
+    material_indices = np.empty(tri_count, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("material_index", material_indices)
+
+    slot_count = len(obj.material_slots)
+    if slot_count == 0:
+        return False
+    material_indices = np.clip(material_indices, 0, slot_count - 1)
+
+    sources = []
+    for index in np.unique(material_indices).tolist():
+        source = diffuse_source(obj.material_slots[index].material)
+        if source is None:
+            return False
+        sources.append((index, source))
+
+    slot_to_source = np.full(slot_count, -1, dtype=np.int64)
+    for n, (index, _) in enumerate(sources):
+        slot_to_source[index] = n
+
+    corner_uvs = []
+    for layer in (mesh.uv_layers[uv_name], old_layer):
+        uv = np.empty(len(layer.data) * 2, dtype=np.float32)
+        layer.data.foreach_get("uv", uv)
+        corner_uvs.append(uv.reshape(-1, 2)[loops].reshape(-1, 3, 2))
+
+    pixels = transfer_texture(
+        corner_uvs[0],
+        corner_uvs[1],
+        slot_to_source[material_indices],
+        [source for _, source in sources],
+        bake_res,
+        bake_margin
+    )
+    img.pixels.foreach_set(pixels.ravel())
+    img.update()
+    return True
+
+
+def snapshot_object(obj):
+    """
+    Record what a bake changes on obj (UV layer names, slot materials,
+    mesh selection) so restore_object() can undo it. Datablocks the bake
+    creates are added to the created_* lists as they are made.
+    """
+    mesh = obj.data
+
+    selection = {}
+    for name in ("vertices", "edges", "polygons"):
+        items = getattr(mesh, name)
+        flags = np.empty(len(items), dtype=bool)
+        items.foreach_get("select", flags)
+        selection[name] = flags
+
+    return {
+        "uv_names": [uv.name for uv in mesh.uv_layers],
+        "active_uv": mesh.uv_layers.active_index,
+        "active_render_uv": next((i for i, uv in enumerate(mesh.uv_layers) if uv.active_render), -1),
+        "materials": [slot.material for slot in obj.material_slots],
+        "active_material_index": obj.active_material_index,
+        "selection": selection,
+        "created_materials": [],
+        "created_images": [],
+        "created_uv_layers": [],
+    }
+
+
+def restore_object(obj, snapshot):
+    """Undo the bake's changes to obj and remove the datablocks it created."""
+    mesh = obj.data
+
+    for slot, mat in zip(obj.material_slots, snapshot["materials"]):
+        slot.material = mat
+    obj.active_material_index = snapshot["active_material_index"]
+
+    for mat in snapshot["created_materials"]:
+        bpy.data.materials.remove(mat)
+    for img in snapshot["created_images"]:
+        bpy.data.images.remove(img)
+
+    for uv_name in snapshot["created_uv_layers"]:
+        layer = mesh.uv_layers.get(uv_name)
+        if layer:
+            mesh.uv_layers.remove(layer)
+
+    # Unique placeholder names first, so no original name is taken while renaming back
+    for i, uv in enumerate(mesh.uv_layers):
+        uv.name = f"__restore_{i}"
+    for uv, name in zip(mesh.uv_layers, snapshot["uv_names"]):
+        uv.name = name
+
+    if snapshot["active_uv"] >= 0:
+        mesh.uv_layers.active_index = snapshot["active_uv"]
+    if snapshot["active_render_uv"] >= 0:
+        mesh.uv_layers[snapshot["active_render_uv"]].active_render = True
+
+    for name, flags in snapshot["selection"].items():
+        getattr(mesh, name).foreach_set("select", flags)
+
 
 # Force enable Cycles addon
 if "cycles" not in bpy.context.preferences.addons:
     bpy.ops.preferences.addon_enable(module="cycles")
 
-prefs = bpy.context.preferences.addons["cycles"].preferences
+if cycles_device == "GPU":
+    prefs = bpy.context.preferences.addons["cycles"].preferences
 
-# Try environment variable override (BEST FOR BACKGROUND)
-device_type = os.environ.get("CYCLES_DEVICE_TYPE", "OPTIX")
-prefs.compute_device_type = device_type
+    # Try environment variable override (BEST FOR BACKGROUND)
+    device_type = os.environ.get("CYCLES_DEVICE_TYPE", "OPTIX")
+    prefs.compute_device_type = device_type
 
-# Force-enable all GPU devices
-try:
-    devices = prefs.devices
-    for d in devices:
-        d.use = True
-    print("FORCED GPU ENABLED:", device_type)
-except:
-    print("FAILED TO ENABLE GPU, FALLING BACK TO CPU")
+    # Force-enable all GPU devices
+    try:
+        devices = prefs.devices
+        for d in devices:
+            d.use = True
+        print("FORCED GPU ENABLED:", device_type)
+    except:
+        print("FAILED TO ENABLE GPU, FALLING BACK TO CPU")
 
-# Tell Cycles to use GPU
-bpy.context.scene.cycles.device = "GPU"
-
-# Bake textures to one texture
-for mesh_name in mesh_names:
-    # Deselect all objects
-    bpy.ops.object.select_all(action='DESELECT')
-
-    # Select only the target mesh
-    obj = bpy.data.objects.get(mesh_name)
-    if obj and obj.type == 'MESH':
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-    else:
-        raise Exception(f"Mesh '{mesh_name}' not found.")
+# Tell Cycles which device to use
+bpy.context.scene.cycles.device = cycles_device
 
-    # === PREPARE RENDER SETTINGS ===
+def prepare_render_settings():
     scene = bpy.context.scene
     scene.render.engine = 'CYCLES'
-    scene.cycles.device = 'GPU'
+    scene.cycles.device = cycles_device
     scene.cycles.samples = samples
 
     # Light path optimization for faster diffuse baking
@@ -67,20 +440,26 @@ for mesh_name in mesh_names:
     scene.cycles.volume_bounces = 0
     scene.cycles.transparent_max_bounces = 0
 
-    # Get the active/selected mesh object
-    obj = bpy.context.active_object
-    if not obj or obj.type != 'MESH':
-        # Try to get first selected mesh
-        selected_meshes = [o for o in bpy.context.selected_objects if o.type == 'MESH']
-        if not selected_meshes:
-            raise Exception("No mesh object selected. Please select a mesh object.")
-        obj = selected_meshes[0]
 
-    bpy.context.view_layer.objects.active = obj
+def select_mesh(mesh_name):
+    # Deselect all objects
+    bpy.ops.object.select_all(action='DESELECT')
+
+    # Select only the target mesh
+    obj = bpy.data.objects.get(mesh_name)
+    if obj and obj.type == 'MESH':
+        obj.select_set(True)
+        bpy.context.view_layer.objects.active = obj
+    else:
+        raise Exception(f"Mesh '{mesh_name}' not found.")
+
     bpy.ops.object.mode_set(mode='OBJECT')
-    mesh_name = obj.name
+    return obj
 
-    print(f"\n=== Processing {mesh_name} ===")
+
+def project_new_uv(obj, snapshot, atlas_entry=None):
+    """Rename the old UV maps, then Smart UV Project a new one (moved into its atlas tile if given)."""
+    mesh_name = obj.name
 
     # Rename existing UV map
     if obj.data.uv_layers:
@@ -93,6 +472,7 @@ for mesh_name in mesh_names:
     # --- Step 1: Create new UV map and Smart UV Project ---
     uv_name = f"{mesh_name}_UV"
     new_uv = obj.data.uv_layers.new(name=uv_name)
+    snapshot["created_uv_layers"].append(new_uv.name)
     # Set it as the active UV map
     obj.data.uv_layers.active = new_uv
 
@@ -106,11 +486,22 @@ for mesh_name in mesh_names:
 
     bpy.ops.object.mode_set(mode='OBJECT')
 
-    # --- Step 2: Create new image ---
-    img_name = f"{mesh_name}_bake"
-    img = bpy.data.images.new(img_name, width=bake_res, height=bake_res, alpha=False)
+    if atlas_entry:
+        move_to_atlas_tile(new_uv, atlas_entry)
+        print(f"Moved UVs into {atlas_entry['atlas']} tile")
+
+    return new_uv
 
-    print(f"Blank image created")
+
+def move_to_atlas_tile(uv_layer, atlas_entry):
+    uv = np.empty(len(uv_layer.data) * 2, dtype=np.float32)
+    uv_layer.data.foreach_get("uv", uv)
+    uv_layer.data.foreach_set("uv", atlas_uvs(uv.reshape(-1, 2), atlas_entry).ravel())
+
+
+def add_bake_nodes(obj, uv_name, img, snapshot):
+    """Point every material of obj at img through the new UVs, sampling its old texture with the old UVs."""
+    mesh_name = obj.name
 
     # --- Step 3: Add UV and Image Texture nodes to each material ---
 
@@ -122,6 +513,7 @@ for mesh_name in mesh_names:
 
         unique_mat = mat.copy()
         unique_mat.name = f"temp_{mesh_name}_{mat.name}"
+        snapshot["created_materials"].append(unique_mat)
         obj.material_slots[slot_idx].material = unique_mat
         print(f"Created unique temporary material '{unique_mat.name}' for {mesh_name}")
                 
@@ -182,15 +574,19 @@ for mesh_name in mesh_names:
             nodes.active = bake_node
             print(f"Set BakedTextureTarget active for material '{mat.name}'")
 
+
+def bake_objects(objects, img):
+    """One Cycles diffuse color bake of all objects into their BakedTextureTarget nodes."""
     # --- Step 4: Bake diffuse color ---
 
     print("Baking Image")
 
     bpy.ops.object.mode_set(mode='OBJECT')
-    bpy.context.view_layer.objects.active = obj
     bpy.ops.object.select_all(action='DESELECT')
-    obj.select_set(True)
-    obj.data.uv_layers.active = new_uv
+    for obj in objects:
+        obj.select_set(True)
+        obj.data.uv_layers.active = obj.data.uv_layers[f"{obj.name}_UV"]
+    bpy.context.view_layer.objects.active = objects[0]
                 
     bpy.ops.object.bake(
         type='DIFFUSE',
@@ -205,9 +601,109 @@ for mesh_name in mesh_names:
 
     print("Baking complete")
 
-    # --- Step 5: Save baked image ---
-    img.save_render(filepath=os.path.join(texture_export_path, f"{mesh_name}.tif"))
+
+def finish_bake(img, texture_path, restores, cache_key):
+    """Save the baked image, add it to the bake cache and undo the changes to each (obj, snapshot)."""
+    if os.path.exists(texture_path):
+        # May be a hard link into the bake cache, which must not be written through
+        os.remove(texture_path)
+    img.save_render(filepath=texture_path)
     print(f"Saved baked texture to {texture_export_path}")
 
+    if bake_cache_dir:
+        store_bake(bake_cache_dir, cache_key, texture_path)
+
     # Reset save state after each bake
-    bpy.ops.wm.open_mainfile(filepath=blender_file_path)
+    if restore_mode == "reload":
+        bpy.ops.wm.open_mainfile(filepath=blender_file_path)
+    else:
+        for obj, snapshot in restores:
+            restore_object(obj, snapshot)
+            print(f"Restored {obj.name}")
+
+
+def bake_mesh(mesh_name):
+    obj = select_mesh(mesh_name)
+    prepare_render_settings()
+    texture_path = os.path.join(texture_export_path, f"{mesh_name}.tif")
+
+    cache_key = None
+    if bake_cache_dir:
+        cache_key = bake_cache_key(obj)
+        if fetch_cached_bake(bake_cache_dir, cache_key, texture_path, bake_cache_link):
+            print(f"\n=== {mesh_name} unchanged, reused cached bake {cache_key} ===")
+            return
+
+    snapshot = snapshot_object(obj)
+
+    print(f"\n=== Processing {mesh_name} ===")
+
+    new_uv = project_new_uv(obj, snapshot)
+
+    # --- Step 2: Create new image ---
+    img_name = f"{mesh_name}_bake"
+    img = bpy.data.images.new(img_name, width=bake_res, height=bake_res, alpha=False)
+    snapshot["created_images"].append(img)
+
+    print(f"Blank image created")
+
+    if fast_diffuse_transfer and transfer_diffuse(obj, img, new_uv.name, f"old_{mesh_name}_UV"):
+        print("Resampled diffuse color onto the new UVs, no Cycles bake needed")
+    else:
+        add_bake_nodes(obj, new_uv.name, img, snapshot)
+        bake_objects([obj], img)
+
+    # --- Step 5: Save baked image ---
+    finish_bake(img, texture_path, [(obj, snapshot)], cache_key)
+
+
+def bake_atlas(atlas_name, members):
+    """Bake every mesh of one atlas into a single shared image, each inside its own tile."""
+    print(f"\n=== Processing {atlas_name}: {', '.join(members)} ===")
+    prepare_render_settings()
+    texture_path = os.path.join(texture_export_path, f"{atlas_name}.tif")
+
+    cache_key = None
+    if bake_cache_dir:
+        h = new_bake_key()
+        update_json(h, [(name, bake_cache_key(select_mesh(name)), atlas_layout["meshes"][name]) for name in members])
+        update_json(h, atlas_layout["atlas_res"])
+        cache_key = h.hexdigest()
+        if fetch_cached_bake(bake_cache_dir, cache_key, texture_path, bake_cache_link):
+            print(f"{atlas_name} unchanged, reused cached bake {cache_key}")
+            return
+
+    atlas_res = atlas_layout["atlas_res"]
+    img = bpy.data.images.new(f"{atlas_name}_bake", width=atlas_res, height=atlas_res, alpha=False)
+
+    restores = []
+    for mesh_name in members:
+        obj = select_mesh(mesh_name)
+        snapshot = snapshot_object(obj)
+        restores.append((obj, snapshot))
+
+        new_uv = project_new_uv(obj, snapshot, atlas_layout["meshes"][mesh_name])
+        add_bake_nodes(obj, new_uv.name, img, snapshot)
+
+    # The shared image is removed with the last mesh's datablocks, after every temp material using it
+    restores[-1][1]["created_images"].append(img)
+
+    bake_objects([obj for obj, _ in restores], img)
+    finish_bake(img, texture_path, restores, cache_key)
+
+
+# Meshes packed into shared atlases by plan_atlases.py are baked per atlas
+atlas_layout = load_atlas_layout(atlas_layout_path)
+atlas_meshes = set(atlas_layout["meshes"]) if atlas_layout else set()
+
+# Bake textures to one texture
+for mesh_name in mesh_names:
+    if mesh_name not in atlas_meshes:
+        bake_mesh(mesh_name)
+
+if atlas_layout:
+    # An atlas is always baked whole, or the missing tiles would come out empty
+    wanted = set(mesh_names)
+    for atlas_name, members in atlas_layout["atlases"].items():
+        if wanted.intersection(members):
+            bake_atlas(atlas_name, members)
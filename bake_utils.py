@@ -0,0 +1,340 @@
+# Blender-independent helpers for bake_single_texture.py.
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+READ_BUFFER = 1 << 20  # 1 MiB read buffer when hashing images
+
+# Bump when the bake itself changes (UV projection, node setup, bake type)
+# so bakes cached by older versions are not reused
+BAKE_CACHE_VERSION = 1
+
+# -------------------------
+# BAKE CACHE
+# -------------------------
+
+_file_digests = {}  # (path, mtime_ns, size) -> digest, so shared images are read once per run
+
+
+def new_bake_key():
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"bake-v{BAKE_CACHE_VERSION}".encode("utf-8"))
+    return h
+
+
+def update_array(h, array):
+    """Add an array's dtype, shape and bytes to the key."""
+    array = np.ascontiguousarray(array)
+    h.update(f"{array.dtype.str}{array.shape}".encode("utf-8"))
+    h.update(array.tobytes())
+
+
+def update_json(h, value):
+    """Add any JSON-serializable value to the key."""
+    h.update(json.dumps(value, sort_keys=True, default=str).encode("utf-8"))
+
+
+def file_digest(path):
+    """Content hash of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    memo_key = (path, stat.st_mtime_ns, stat.st_size)
+    digest = _file_digests.get(memo_key)
+    if digest is None:
+        h = hashlib.blake2b(digest_size=20)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(READ_BUFFER), b""):
+                h.update(chunk)
+        digest = _file_digests[memo_key] = h.hexdigest()
+    return digest
+
+
+def bytes_digest(data):
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def cached_bake_path(cache_dir, key):
+    """<cache_dir>/<first two hex digits>/<key>.tif"""
+    return os.path.join(cache_dir, key[:2], f"{key}.tif")
+
+
+def fetch_cached_bake(cache_dir, key, target_path, link=False):
+    """
+    Put the cached bake for key at target_path (hard link when link is set
+    and possible, else a copy). Returns False if key is not cached.
+    """
+    source = cached_bake_path(cache_dir, key)
+    if not os.path.exists(source):
+        return False
+
+    tmp_path = target_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    linked = False
+    if link:
+        try:
+            os.link(source, tmp_path)
+            linked = True
+        except OSError:
+            pass  # Different drive or no hard link support
+    if not linked:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target_path)
+    # Fresh mtime, so the bake farm counts the mesh as baked in this run
+    os.utime(target_path)
+    return True
+
+
+def store_bake(cache_dir, key, source_path):
+    """Copy a finished bake into the cache; safe with several bake processes at once."""
+    target = cached_bake_path(cache_dir, key)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    shutil.copyfile(source_path, tmp_path)
+    os.replace(tmp_path, target)
+
+
+# -------------------------
+# UV TRANSFER
+# -------------------------
+
+RASTER_CHUNK = 1 << 22  # Candidate pixels tested per batch when rasterizing
+
+
+def linear_to_srgb(color):
+    """Scene linear to sRGB encoded values, for colors written into byte images."""
+    color = np.clip(np.asarray(color, dtype=np.float32), 0, 1)
+    return np.where(color <= 0.0031308, color * 12.92, 1.055 * color ** (1 / 2.4) - 0.055)
+
+
+def rasterize_triangles(uv, res):
+    """
+    Yield (tri, x, y, weights) for every pixel whose center lies inside a
+    triangle of the (T, 3, 2) UVs on a res x res grid, in batches of at
+    most RASTER_CHUNK candidate pixels. weights are (N, 3) barycentric
+    coordinates; pixel (x, y) covers UVs [x / res, (x + 1) / res).
+    """
+    p = uv.astype(np.float64) * res - 0.5  # Pixel centers on integer coordinates
+    lo = np.clip(np.ceil(p.min(axis=1)), 0, res).astype(np.int64)
+    hi = np.clip(np.floor(p.max(axis=1)), -1, res - 1).astype(np.int64)
+    size = np.maximum(hi - lo + 1, 0)
+    counts = size[:, 0] * size[:, 1]
+
+    # Barycentric weights as linear functions of the pixel position: w = x * kx + y * ky + k
+    a, b, c = p[:, 0], p[:, 1], p[:, 2]
+    area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    valid = (counts > 0) & (np.abs(area) > 1e-12)
+    inv = np.divide(1, area, out=np.zeros_like(area), where=valid)
+    coeffs = np.column_stack((
+        (c[:, 1] - a[:, 1]) * inv, (a[:, 0] - c[:, 0]) * inv,
+        ((c[:, 0] - a[:, 0]) * a[:, 1] - (c[:, 1] - a[:, 1]) * a[:, 0]) * inv,
+        (a[:, 1] - b[:, 1]) * inv, (b[:, 0] - a[:, 0]) * inv,
+        ((b[:, 1] - a[:, 1]) * a[:, 0] - (b[:, 0] - a[:, 0]) * a[:, 1]) * inv,
+    ))
+
+    tris = np.flatnonzero(valid)
+    bounds = np.cumsum(counts[tris])
+    start = 0
+    while start < len(tris):
+        # Always take at least one triangle, however big
+        base = bounds[start - 1] if start else 0
+        stop = max(start + 1, int(np.searchsorted(bounds, base + RASTER_CHUNK, side="right")))
+        chunk = tris[start:stop]
+        start = stop
+
+        tri = np.repeat(chunk, counts[chunk])
+        offset = np.arange(len(tri)) - np.repeat(np.cumsum(counts[chunk]) - counts[chunk], counts[chunk])
+        width = size[tri, 0]
+        x = lo[tri, 0] + offset % width
+        y = lo[tri, 1] + offset // width
+
+        k = coeffs[tri]
+        w1 = x * k[:, 0] + y * k[:, 1] + k[:, 2]
+        w2 = x * k[:, 3] + y * k[:, 4] + k[:, 5]
+        w0 = 1 - w1 - w2
+
+        inside = (w0 >= -1e-9) & (w1 >= -1e-9) & (w2 >= -1e-9)
+        yield tri[inside], x[inside], y[inside], np.column_stack((w0[inside], w1[inside], w2[inside]))
+
+
+def sample_bilinear(pixels, uv, extension="REPEAT"):
+    """Bilinearly sample (H, W, C) pixels (row 0 at the bottom, as in Blender) at (N, 2) UVs."""
+    h, w = pixels.shape[:2]
+    x = uv[:, 0] * w - 0.5
+    y = uv[:, 1] * h - 0.5
+    x0 = np.floor(x)
+    y0 = np.floor(y)
+    fx = (x - x0)[:, None].astype(np.float32)
+    fy = (y - y0)[:, None].astype(np.float32)
+    x0 = x0.astype(np.int64)
+    y0 = y0.astype(np.int64)
+
+    if extension == "REPEAT":
+        x0, x1 = x0 % w, (x0 + 1) % w
+        y0, y1 = y0 % h, (y0 + 1) % h
+    else:
+        x0, x1 = np.clip(x0, 0, w - 1), np.clip(x0 + 1, 0, w - 1)
+        y0, y1 = np.clip(y0, 0, h - 1), np.clip(y0 + 1, 0, h - 1)
+
+    bottom = pixels[y0, x0] * (1 - fx) + pixels[y0, x1] * fx
+    top = pixels[y1, x0] * (1 - fx) + pixels[y1, x1] * fx
+    return bottom * (1 - fy) + top * fy
+
+
+def dilate(pixels, filled, margin):
+    """Grow the filled region by margin pixels, each new pixel the mean of its filled neighbours."""
+    h, w = filled.shape
+    for _ in range(margin):
+        total = np.zeros_like(pixels)
+        count = np.zeros((h, w), dtype=np.float32)
+        for dy, dx in ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)):
+            src_y = slice(max(dy, 0), h + min(dy, 0))
+            dst_y = slice(max(-dy, 0), h + min(-dy, 0))
+            src_x = slice(max(dx, 0), w + min(dx, 0))
+            dst_x = slice(max(-dx, 0), w + min(-dx, 0))
+            neighbour = filled[src_y, src_x]
+            total[dst_y, dst_x] += pixels[src_y, src_x] * neighbour[..., None]
+            count[dst_y, dst_x] += neighbour
+
+        grow = ~filled & (count > 0)
+        if not grow.any():
+            break
+        pixels[grow] = total[grow] / count[grow][:, None]
+        filled |= grow
+
+
+def transfer_texture(new_uv, old_uv, tri_sources, sources, res, margin=0):
+    """
+    Bake a res x res RGBA image laid out by the (T, 3, 2) new_uv from the
+    per-triangle sources, sampled at the matching old_uv corners.
+
+    tri_sources gives each triangle's index into sources (-1: left empty).
+    Each source is {"pixels": (H, W, C) array, "extension": "REPEAT" or
+    "EXTEND"} or {"color": RGB}. Pixels are returned as (res, res, 4)
+    float32 with row 0 at the bottom, ready for Image.pixels.
+    """
+    out = np.zeros((res, res, 4), dtype=np.float32)
+    out[..., 3] = 1
+    filled = np.zeros((res, res), dtype=bool)
+    old_uv = old_uv.astype(np.float64)
+
+    for tri, x, y, weights in rasterize_triangles(new_uv, res):
+        source_index = tri_sources[tri]
+        uv = np.einsum("nk,nkj->nj", weights, old_uv[tri])
+
+        for s in np.unique(source_index).tolist():
+            if s < 0:
+                continue
+            sel = source_index == s
+            source = sources[s]
+            if "color" in source:
+                color = np.asarray(source["color"], dtype=np.float32)[:3]
+            else:
+                color = sample_bilinear(source["pixels"], uv[sel], source.get("extension", "REPEAT"))[:, :3]
+            out[y[sel], x[sel], :3] = color
+            filled[y[sel], x[sel]] = True
+
+    dilate(out, filled, margin)
+    return out
+
+
+# -------------------------
+# ATLAS PACKING
+# -------------------------
+
+def surface_area(world_verts, tris):
+    """Total area of the (T, 3) triangles over (N, 3) vertices."""
+    v = np.asarray(world_verts, dtype=np.float64)[tris]
+    return float(np.linalg.norm(np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0]), axis=1).sum() / 2)
+
+
+def tile_size(area, texel_density, min_tile=32):
+    """Power-of-two tile side giving area (m²) about texel_density pixels per meter."""
+    side = max(np.sqrt(area) * texel_density, min_tile)
+    return 1 << int(np.ceil(np.log2(side)))
+
+
+def shelf_pack(tiles, atlas_res):
+    """
+    Pack (name, size) square tiles into as few atlas_res atlases as a
+    shelf packer manages, biggest tiles first. Returns one list of
+    (name, x, y, size) per atlas.
+    """
+    atlases = []  # [placements, shelves]; a shelf is [y, height, next free x]
+    for name, size in sorted(tiles, key=lambda tile: (-tile[1], tile[0])):
+        for placements, shelves in atlases:
+            shelf = next((s for s in shelves if s[1] >= size and s[2] + size <= atlas_res), None)
+            if shelf is None:
+                top = shelves[-1][0] + shelves[-1][1] if shelves else 0
+                if top + size > atlas_res:
+                    continue
+                shelf = [top, size, 0]
+                shelves.append(shelf)
+            placements.append((name, shelf[2], shelf[0], size))
+            shelf[2] += size
+            break
+        else:
+            atlases.append([[(name, 0, 0, size)], [[0, size, size]]])
+
+    return [placements for placements, _ in atlases]
+
+
+def plan_atlases(areas, atlas_res, texel_density, padding=0, prefix="atlas"):
+    """
+    Group meshes ({name: surface area in m²}) whose tile is smaller than
+    atlas_res into shared atlases. Returns the layout written to
+    atlas_layout.json:
+
+        {"atlas_res": R, "atlases": {atlas: [mesh, ...]},
+         "meshes": {mesh: {"atlas": atlas, "offset": [u, v], "scale": s}}}
+
+    A mesh's UVs (0-1) map into its tile, inset by padding / 2 pixels on
+    each side so bake margins do not bleed into neighbours, as
+    uv * scale + offset. Meshes needing a full atlas_res texture are left
+    out and baked on their own, as are meshes left alone in an atlas.
+    """
+    tiles = []
+    for name, area in areas.items():
+        size = tile_size(area, texel_density)
+        if size < atlas_res and size > padding:
+            tiles.append((name, size))
+
+    layout = {"atlas_res": atlas_res, "atlases": {}, "meshes": {}}
+    # A mesh alone in an atlas is better off with its own bake
+    packed = [placements for placements in shelf_pack(tiles, atlas_res) if len(placements) > 1]
+    for index, placements in enumerate(packed):
+        atlas_name = f"{prefix}_{index}"
+        layout["atlases"][atlas_name] = [name for name, _, _, _ in placements]
+        for name, x, y, size in placements:
+            layout["meshes"][name] = {
+                "atlas": atlas_name,
+                "offset": [(x + padding / 2) / atlas_res, (y + padding / 2) / atlas_res],
+                "scale": (size - padding) / atlas_res,
+            }
+    return layout
+
+
+def atlas_uvs(uv, atlas_entry):
+    """Move (N, 2) UVs in 0-1 into the mesh's atlas tile."""
+    return uv * np.float32(atlas_entry["scale"]) + np.array(atlas_entry["offset"], dtype=np.float32)
+
+
+def load_atlas_layout(path):
+    """The layout from plan_atlases(), or None when there is no layout file."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_atlas_layout(path, layout):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(layout, f, indent=4)
+    os.replace(path + ".tmp", path)
@@ -0,0 +1,163 @@
+# Checks the vectorized collision export against the old per-triangle
+# mathutils code and times both; run with plain python:
+#   python benchmark_collision.py [num_triangles]
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from collision_export import collision_settings, export_collision_map
+from collision_utils import EXTRUDE, SCALE
+from map_utils import format_triangle_brush, guid_provider, write_collision_map
+
+f32 = np.float32
+
+
+# -------------------------
+# MATHUTILS EMULATION
+# -------------------------
+# Vector stores float32; these follow Blender's C code for the operations
+# the old export_collision_map() used, one float32 scalar at a time.
+
+def mat_vec(m, v):
+    """matrix_world @ v: float32 products summed in double, stored as float32."""
+    vec = (v[0], v[1], v[2], f32(1))
+    out = []
+    for row in range(3):
+        dot = 0.0
+        for col in range(4):
+            dot += float(m[row][col] * vec[col])
+        out.append(f32(dot))
+    return out
+
+
+def sub(a, b):
+    return [f32(x - y) for x, y in zip(a, b)]
+
+
+def add(a, b):
+    return [f32(x + y) for x, y in zip(a, b)]
+
+
+def mul(a, scalar):
+    return [f32(x * f32(scalar)) for x in a]
+
+
+def cross(a, b):
+    return [f32(a[1] * b[2] - a[2] * b[1]), f32(a[2] * b[0] - a[0] * b[2]), f32(a[0] * b[1] - a[1] * b[0])]
+
+
+def dot(a, b):
+    d = 0.0
+    for i in (2, 1, 0):
+        d += float(a[i] * b[i])
+    return f32(d)
+
+
+def length(a):
+    return float(np.sqrt(float(dot(a, a))))
+
+
+def normalized(a):
+    d = dot(a, a)
+    if d <= f32(1e-35):
+        return [f32(0)] * 3
+    inverse = f32(f32(1) / np.sqrt(d))
+    return [f32(x * inverse) for x in a]
+
+
+def round_vec(vec, decimals=4):
+    return [f32(round(float(coord), decimals)) for coord in vec]
+
+
+def world(v, m):
+    """Convert local vertex → world space → inches."""
+    v_world = mat_vec(m, v)
+    return [f32(float(coord) * SCALE) for coord in v_world]
+
+
+def tri_area(a, b, c):
+    return length(cross(sub(b, a), sub(c, a))) / 2
+
+
+def is_valid_brush(v1, v2, v3, v1e, v2e, v3e):
+    if tri_area(v1, v2, v3) < 0.0001:
+        return False
+    if tri_area(v1e, v2e, v3e) < 0.0001:
+        return False
+    if abs(float(dot(sub(v2, v1), cross(sub(v3, v1), sub(v1e, v1))))) / 6 < 0.0001:
+        return False
+    if length(cross(sub(v2, v1), sub(v3, v1))) < 0.0001:
+        return False
+    return True
+
+
+def legacy_export_collision_map(mesh_name, filepath, local_verts, tris, matrix_world, settings):
+    """The per-triangle loop create_col_maps.py used to run, with emulated mathutils math."""
+    m = np.asarray(matrix_world, dtype=np.float32)
+    guid = guid_provider(mesh_name, settings["deterministic_guids"])
+
+    def brushes():
+        for i, (a, b, c) in enumerate(np.asarray(tris).tolist()):
+            v1, v2, v3 = (world(local_verts[k], m) for k in (a, b, c))
+            normal = normalized(cross(sub(v2, v1), sub(v3, v1)))
+            offset = mul(mul(normal, EXTRUDE), SCALE)
+            corners = [round_vec(v) for v in (v1, v2, v3, add(v1, offset), add(v2, offset), add(v3, offset))]
+            if not is_valid_brush(*corners):
+                continue
+            corners = [[float(coord) for coord in v] for v in corners]
+            yield format_triangle_brush(i, guid(f"brush/{i}"), corners, settings["clip"], settings["lightmap"])
+
+    return write_collision_map(filepath, mesh_name, brushes(), guid)
+
+
+# -------------------------
+# BENCHMARK
+# -------------------------
+
+def sample_mesh(num_triangles, seed=0):
+    """Random triangles of mixed sizes (down to near-degenerate) under a rotated, scaled, moved transform."""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(-20, 20, (num_triangles, 1, 3))
+    sizes = rng.choice([1.0, 1e-2, 1e-3, 3e-4, 1e-4], (num_triangles, 1, 1))
+    local_verts = (centers + rng.uniform(-1, 1, (num_triangles, 3, 3)) * sizes).reshape(-1, 3).astype(np.float32)
+    tris = np.arange(len(local_verts)).reshape(-1, 3)
+
+    c, s = np.cos(0.7), np.sin(0.7)
+    matrix_world = np.array([[c, -s, 0, 3.25], [s, c, 0, -1.5], [0, 0, 1.3, 0.75], [0, 0, 0, 1]], dtype=np.float32)
+    return local_verts, tris, matrix_world
+
+
+def bench_export(tmp_dir, num_triangles):
+    print(f"\n=== Collision export: {num_triangles} triangles ===")
+    settings = collision_settings({
+        "material_type": "default",
+        "materials": {"default": {"full_clip": "clip"}},
+        "deterministic_guids": True,
+    })
+
+    for label, transformed in (("identity", False), ("transformed", True)):
+        local_verts, tris, matrix_world = sample_mesh(num_triangles)
+        if not transformed:
+            matrix_world = np.eye(4, dtype=np.float32)
+
+        paths = {}
+        for name, func in (("legacy", legacy_export_collision_map), ("vectorized", export_collision_map)):
+            paths[name] = os.path.join(tmp_dir, f"{label}_{name}.map")
+            kwargs = {"log": lambda message: None} if func is export_collision_map else {}
+            start = time.perf_counter()
+            count = func("bench", paths[name], local_verts, tris, matrix_world, settings, **kwargs)
+            print(f"{label:<12} {name:<11} {time.perf_counter() - start:8.2f} s  {count} brushes")
+
+        with open(paths["legacy"], "rb") as a, open(paths["vectorized"], "rb") as b:
+            print("Outputs match" if a.read() == b.read() else "WARNING: outputs differ")
+
+
+if __name__ == "__main__":
+    num_triangles = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bench_export(tmp_dir, num_triangles)
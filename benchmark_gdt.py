@@ -0,0 +1,137 @@
+# Throughput benchmarks for the GDT tooling; run with plain python:
+#   python benchmark_gdt.py [num_blocks] [num_entries]
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from gdt_templates import MATERIAL_BODY, MATERIAL_TEMPLATE
+from gdt_utils import compile_template, dedupe_gdt, write_rendered
+
+
+def legacy_remove_duplicate_blocks(input_path, output_path):
+    """The readlines() implementation clean_duplicates_in_gdt.py used to ship."""
+    with open(input_path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+
+    seen_headers = set()
+    output_lines = []
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+
+        if line.strip().startswith('"') and '(' in line and ')' in line:
+            header = line.strip()
+
+            j = i + 1
+            while j < len(lines) and lines[j].strip() == "":
+                j += 1
+
+            if j < len(lines) and lines[j].strip() == "{":
+                if header in seen_headers:
+                    brace_depth = 0
+                    i = j
+                    while i < len(lines):
+                        if "{" in lines[i]:
+                            brace_depth += 1
+                        if "}" in lines[i]:
+                            brace_depth -= 1
+                            if brace_depth == 0:
+                                i += 1
+                                break
+                        i += 1
+                    continue
+                else:
+                    seen_headers.add(header)
+
+        output_lines.append(line)
+        i += 1
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.writelines(output_lines)
+
+
+def write_sample_gdt(path, num_blocks, duplicate_every=4):
+    """Write a GDT of material-sized blocks with every Nth block duplicated."""
+    body = "".join(f'\t\t"key{k}" "value{k}"\n' for k in range(200))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        for i in range(num_blocks):
+            name = f"mat_{i - 1 if i % duplicate_every == 0 and i else i}"
+            f.write(f'\t"{name}" ( "material.gdf" )\n\t{{\n{body}\t}}\n')
+        f.write("}\n")
+
+
+def run(label, func, input_path, output_path):
+    size_mb = os.path.getsize(input_path) / (1024 * 1024)
+
+    start = time.perf_counter()
+    func(input_path, output_path)
+    elapsed = time.perf_counter() - start
+
+    # Second pass under tracemalloc, which would skew the timing above
+    tracemalloc.start()
+    func(input_path, output_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<12} {elapsed:8.2f} s  {size_mb / elapsed:8.1f} MB/s  peak {peak / (1024 * 1024):8.1f} MB")
+
+
+def bench_dedupe(tmp_dir, num_blocks):
+    input_path = os.path.join(tmp_dir, "input.gdt")
+    write_sample_gdt(input_path, num_blocks)
+    print(f"\n=== Dedup: {num_blocks} blocks, {os.path.getsize(input_path) / (1024 * 1024):.1f} MB ===")
+
+    legacy_path = os.path.join(tmp_dir, "legacy.gdt")
+    streaming_path = os.path.join(tmp_dir, "streaming.gdt")
+    run("legacy", legacy_remove_duplicate_blocks, input_path, legacy_path)
+    run("streaming", dedupe_gdt, input_path, streaming_path)
+
+    with open(legacy_path, "rb") as a, open(streaming_path, "rb") as b:
+        print("Outputs match" if a.read() == b.read() else "WARNING: outputs differ")
+
+
+def bench_templates(tmp_dir, num_entries):
+    print(f"\n=== Render: {num_entries} material entries ===")
+    rows = [
+        {"name": f"mat_{i}", "tex": f"tex_{i}", "glossSurfaceType": "0-4", "surfaceType": "concrete"}
+        for i in range(num_entries)
+    ]
+
+    def format_path(output_path):
+        with open(output_path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(
+                    MATERIAL_TEMPLATE.format(
+                        name=row["name"],
+                        body=MATERIAL_BODY.format(tex=row["tex"], glossSurfaceType=row["glossSurfaceType"], surfaceType=row["surfaceType"]),
+                    )
+                )
+
+    def compiled_path(output_path):
+        compiled = compile_template(MATERIAL_TEMPLATE, body=MATERIAL_BODY)
+        with open(output_path, "w", encoding="utf-8") as f:
+            write_rendered(f, compiled, rows)
+
+    for label, func in (("format", format_path), ("compiled", compiled_path)):
+        output_path = os.path.join(tmp_dir, f"{label}.gdt")
+        start = time.perf_counter()
+        func(output_path)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<12} {elapsed:8.2f} s  {num_entries / elapsed:10.0f} entries/s")
+
+    with open(os.path.join(tmp_dir, "format.gdt"), "rb") as a, open(os.path.join(tmp_dir, "compiled.gdt"), "rb") as b:
+        print("Outputs match" if a.read() == b.read() else "WARNING: outputs differ")
+
+
+if __name__ == "__main__":
+    num_blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    num_entries = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bench_dedupe(tmp_dir, num_blocks)
+        bench_templates(tmp_dir, num_entries)
@@ -1,5 +1,15 @@
 import json
 import os
+import time
+
+from gdt_utils import (
+    dedupe_gdt,
+    dedupe_gdt_by_content,
+    drop_gdt_blocks_in_files,
+    find_cross_file_duplicates,
+    find_gdt_files,
+    index_gdt_files,
+)
 
 script_dir = os.path.dirname(os.path.realpath(__file__))
 json_path = os.path.join(script_dir, "data.json")
@@ -8,54 +18,89 @@ with open(json_path, "r") as f:
     data = json.load(f)
 
 gdt_path = data.get("gdt_path")
+# Overwrite gdt_path (via temp file + atomic rename) instead of writing output_deduped.gdt
+dedupe_in_place = data.get("dedupe_in_place", False)
+# "header": drop repeated names; "content": also collapse blocks with identical bodies
+dedupe_mode = data.get("dedupe_mode", "header")
+# Directory mode: dedupe every .gdt under gdt_dir (e.g. source_data) against each other
+gdt_dir = data.get("gdt_dir")
+gdt_dir_action = data.get("gdt_dir_action", "report")  # "report" or "remove"
+gdt_workers = data.get("gdt_workers")  # defaults to one process per core
 
 def remove_duplicate_blocks(input_path, output_path):
-    with open(input_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
-    seen_headers = set()
-    output_lines = []
-
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-
-        # Detect header line:  "name" ( "type" )
-        if line.strip().startswith('"') and '(' in line and ')' in line:
-            header = line.strip()
-
-            # Expect next non-empty line to be "{"
-            j = i + 1
-            while j < len(lines) and lines[j].strip() == "":
-                j += 1
-
-            if j < len(lines) and lines[j].strip() == "{":
-                if header in seen_headers:
-                    # Skip this entire block
-                    brace_depth = 0
-                    i = j
-                    while i < len(lines):
-                        if "{" in lines[i]:
-                            brace_depth += 1
-                        if "}" in lines[i]:
-                            brace_depth -= 1
-                            if brace_depth == 0:
-                                i += 1
-                                break
-                        i += 1
-                    continue
-                else:
-                    seen_headers.add(header)
-
-        output_lines.append(line)
-        i += 1
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.writelines(output_lines)
+    # Streams the file block by block, so memory stays flat for large GDTs
+    kept, dropped = dedupe_gdt(input_path, output_path)
+    print(f"Kept {kept} blocks, removed {dropped} duplicates")
+
+
+def remove_duplicate_content(input_path, output_path):
+    kept, dropped, aliases = dedupe_gdt_by_content(input_path, output_path)
+    print(f"Kept {kept} blocks, removed {dropped} duplicates ({len(aliases)} with identical content)")
+
+    if aliases:
+        write_alias_remap(aliases, os.path.splitext(output_path)[0] + "_aliases.json")
+
+
+def write_alias_remap(aliases, remap_path):
+    """Print the {(alias name, gdf): kept name} table and save it to remap_path."""
+    # Anything still referencing an alias must be pointed at the kept asset
+    print("\n=== Alias remap ===")
+    width = max(len(name) for name, _ in aliases)
+    for (name, gdf), original in sorted(aliases.items(), key=lambda item: (item[0][1], item[0][0])):
+        print(f"{name:<{width}}  ->  {original}  ({gdf})")
+
+    # Same table as JSON, grouped by gdf type: {gdf: {alias: kept name}}
+    grouped = {}
+    for (name, gdf), original in aliases.items():
+        grouped.setdefault(gdf, {})[name] = original
+
+    with open(remap_path, "w", encoding="utf-8") as f:
+        json.dump(grouped, f, indent=4)
+    print(f"\nAlias remap written to {remap_path}")
+
+
+def remove_cross_file_duplicates(source_dir, remove=False):
+    start = time.perf_counter()
+    gdt_paths = find_gdt_files(source_dir)
+    file_entries = index_gdt_files(gdt_paths, gdt_workers)
+    total_blocks = sum(len(entries) for entries in file_entries.values())
+    print(f"Indexed {total_blocks} blocks in {len(gdt_paths)} GDTs ({time.perf_counter() - start:.2f} s)")
+
+    drop, duplicates = find_cross_file_duplicates(file_entries, by_content=dedupe_mode == "content")
+
+    print(f"\n=== Duplicates ({len(duplicates)}) ===")
+    for path, name, gdf, kept_path, kept_name in duplicates:
+        kept = kept_path if kept_name == name else f"{kept_path} as {kept_name}"
+        print(f"{os.path.relpath(path, source_dir)}: {name} ({gdf}) duplicates {os.path.relpath(kept, source_dir)}")
+
+    # Content aliases, written next to the directory: source_data -> source_data_aliases.json
+    aliases = {(name, gdf): kept_name for _, name, gdf, _, kept_name in duplicates if kept_name != name}
+    if aliases:
+        write_alias_remap(aliases, os.path.normpath(source_dir) + "_aliases.json")
+
+    if not remove:
+        return
+
+    # Files with repeats inside themselves are rewritten too
+    for path, entries in file_entries.items():
+        if len({(name, gdf) for name, gdf, _ in entries}) != len(entries):
+            drop.setdefault(path, set())
+
+    results = drop_gdt_blocks_in_files(drop, gdt_workers)
+    removed = sum(dropped for _, dropped in results.values())
+    repeats = removed - len(duplicates)
+    print(f"\nRemoved {removed} blocks from {len(results)} GDTs ({time.perf_counter() - start:.2f} s)")
+    if repeats:
+        print(f"{len(duplicates)} listed above, {repeats} repeated headers within one file")
 
 
 # Example usage
-remove_duplicate_blocks(
-    input_path=gdt_path,
-    output_path="output_deduped.gdt"
-)
+if __name__ == "__main__":
+    if gdt_dir:
+        remove_cross_file_duplicates(gdt_dir, remove=gdt_dir_action == "remove")
+    else:
+        dedupe = remove_duplicate_content if dedupe_mode == "content" else remove_duplicate_blocks
+        dedupe(
+            input_path=gdt_path,
+            output_path=gdt_path if dedupe_in_place else "output_deduped.gdt"
+        )
@@ -0,0 +1,215 @@
+# Blender-independent collision map export, shared by create_col_maps.py
+# (geometry read from the open .blend) and export_col_maps_from_cache.py
+# (geometry read from the mesh cache).
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from collision_utils import (
+    CONCAVITY_SAMPLES,
+    EXTRUDE,
+    SCALE,
+    clean_triangles,
+    convex_decompose,
+    hull_brush_planes,
+    merge_coplanar,
+    polygon_brush_planes,
+    simplify_quadric,
+    strict_brush_mask,
+    strict_planes_ok,
+    to_world,
+    triangle_brushes,
+)
+from map_utils import guid_provider, iter_brushes, iter_triangle_brushes, write_collision_map
+from mesh_cache import load_mesh
+
+LIGHTMAP = "lightmap_gray"
+MAP_MANIFEST_NAME = "col_maps_manifest.json"  # geometry hash per map, kept in coll_maps_dir
+# Bump when the map output changes for the same input (weld, simplify,
+# convex or brush code), so existing maps are rebuilt instead of reused
+COLLISION_VERSION = 1
+
+
+def collision_settings(data):
+    """Collision options from data.json, as a plain dict that can be sent to worker processes."""
+    material_type = data.get("material_type")
+    return {
+        # other textures: wall_climb, dirt, grass, clip, brick, carpet, clip, cloth, concret, glass, ice, metal, mud, plaster, plastic, rock, sand, snow, stone, wood
+        "clip": data.get("materials").get(material_type).get("full_clip"),
+        "lightmap": LIGHTMAP,
+        # GUIDs derived from mesh name + brush index, so re-exporting unchanged geometry gives identical maps
+        "deterministic_guids": data.get("deterministic_guids", False),
+        # Merge adjacent coplanar triangles into convex polygons, one brush per polygon
+        "merge_coplanar": data.get("merge_coplanar", False),
+        "coplanar_angle": data.get("coplanar_angle", 0.5),  # degrees
+        "coplanar_distance": data.get("coplanar_distance", 0.01),  # inches
+        # Weld vertices within weld_tolerance inches and drop duplicate / back-to-back triangles
+        "weld_collision": data.get("weld_collision", False),
+        "weld_tolerance": data.get("weld_tolerance", 0.01),  # inches
+        # Quadric error simplification of the collision triangles before brushes are built
+        "simplify_collision": data.get("simplify_collision", False),
+        "simplify_ratio": data.get("simplify_ratio", 0.5),  # fraction of triangles to keep
+        "simplify_max_error": data.get("simplify_max_error", 1.0),  # inches
+        # Per-mesh convex decomposition, e.g. {"crate": {"max_hulls": 4, "concavity": 2.0}}; "*" applies to every mesh
+        "convex_decomposition": data.get("convex_decomposition", {}),
+        "convex_max_samples": data.get("convex_max_samples", CONCAVITY_SAMPLES),  # surface samples scored per piece
+        # Drop brushes the map compiler is likely to reject (slivers, tiny edges, imprecise planes)
+        "strict_brushes": data.get("strict_brushes", False),
+        "min_edge_length": data.get("min_edge_length", 0.05),  # inches
+        "min_sliver_angle": data.get("min_sliver_angle", 1.0),  # degrees
+        "max_plane_error": data.get("max_plane_error", 0.05),  # inches
+    }
+
+
+def keep_brush_planes(brush_planes, mesh_name, settings, log=print):
+    """Drop the None (degenerate) entries, and with strict_brushes the brushes failing strict_planes_ok()."""
+    rejected = 0
+    for planes in brush_planes:
+        if planes is None:
+            continue
+        if settings["strict_brushes"] and not strict_planes_ok(planes, settings["min_edge_length"], settings["max_plane_error"]):
+            rejected += 1
+            continue
+        yield planes
+
+    if rejected:
+        log(f"{mesh_name}: dropped {rejected} brushes that failed the strict checks")
+
+
+def geometry_hash(mesh_name, local_verts, tris, matrix_world, settings):
+    """
+    Hash of everything a mesh's map is built from: vertices, triangles,
+    matrix_world, SCALE/EXTRUDE, the settings that apply to this mesh and
+    COLLISION_VERSION.
+    """
+    convex_decomposition = settings["convex_decomposition"]
+    options = dict(settings, convex_decomposition=convex_decomposition.get(mesh_name, convex_decomposition.get("*")))
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"collision-v{COLLISION_VERSION}".encode("utf-8"))
+    h.update(np.ascontiguousarray(local_verts, dtype=np.float32).tobytes())
+    h.update(np.ascontiguousarray(tris, dtype=np.int32).tobytes())
+    h.update(np.asarray(matrix_world, dtype=np.float32).tobytes())
+    h.update(json.dumps([SCALE, EXTRUDE, options], sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_map_manifest(coll_maps_dir):
+    path = os.path.join(coll_maps_dir, MAP_MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_map_manifest(coll_maps_dir, manifest):
+    path = os.path.join(coll_maps_dir, MAP_MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def map_is_current(filepath, digest, previous):
+    """True when the map exists and was built from geometry with the same hash."""
+    return previous == digest and os.path.exists(filepath)
+
+
+def export_collision_map(mesh_name, filepath, local_verts, tris, matrix_world, settings, log=print):
+    """
+    Build the collision map for one mesh from its (N, 3) local vertices,
+    (T, 3) triangle indices and 4x4 matrix_world, and write it to filepath.
+    Progress messages go to log. Returns the number of brushes written.
+    """
+    clip = settings["clip"]
+    lightmap = settings["lightmap"]
+
+    # Transform every vertex once, then build and validate all brushes in array operations
+    world_verts = to_world(local_verts, matrix_world)
+    tris = np.asarray(tris)
+
+    if settings["weld_collision"]:
+        tris, removed = clean_triangles(world_verts, tris, settings["weld_tolerance"])
+        log(f"{mesh_name}: removed {removed['degenerate']} collapsed and {removed['duplicate']} duplicate triangles")
+
+    if settings["simplify_collision"]:
+        triangle_count = len(tris)
+        world_verts, tris = simplify_quadric(world_verts, tris, settings["simplify_ratio"], settings["simplify_max_error"])
+        log(f"{mesh_name}: simplified {triangle_count} -> {len(tris)} triangles")
+
+    guid = guid_provider(mesh_name, settings["deterministic_guids"])
+    convex_decomposition = settings["convex_decomposition"]
+    convex_settings = convex_decomposition.get(mesh_name, convex_decomposition.get("*"))
+
+    if convex_settings is not None:
+        hulls = convex_decompose(
+            world_verts,
+            tris,
+            convex_settings.get("max_hulls", 8),
+            convex_settings.get("concavity", 2.0),
+            EXTRUDE,
+            settings["convex_max_samples"]
+        )
+        planes = (hull_brush_planes(points, faces) for points, faces in hulls)
+        brushes = iter_brushes(keep_brush_planes(planes, mesh_name, settings, log), clip, lightmap, guid)
+        count = write_collision_map(filepath, mesh_name, brushes, guid)
+
+        reduction = 100 * (1 - count / len(tris)) if len(tris) else 0
+        log(f"{mesh_name}: {len(tris)} triangles -> {count} convex hull brushes ({reduction:.1f}% fewer)")
+    elif settings["merge_coplanar"]:
+        polygons = merge_coplanar(world_verts, tris, settings["coplanar_angle"], settings["coplanar_distance"])
+        planes = (polygon_brush_planes(world_verts, loop, normal, EXTRUDE) for loop, normal in polygons)
+        brushes = iter_brushes(keep_brush_planes(planes, mesh_name, settings, log), clip, lightmap, guid)
+        count = write_collision_map(filepath, mesh_name, brushes, guid)
+
+        reduction = 100 * (1 - count / len(tris)) if len(tris) else 0
+        log(f"{mesh_name}: {len(tris)} triangles -> {count} brushes ({reduction:.1f}% fewer)")
+    else:
+        v, ve, valid = triangle_brushes(world_verts, tris, EXTRUDE)
+
+        for i in np.flatnonzero(~valid).tolist():
+            log(f"Skipping invalid brush at triangle {i}")
+
+        if settings["strict_brushes"]:
+            strict = strict_brush_mask(v, ve, settings["min_edge_length"], settings["min_sliver_angle"], settings["max_plane_error"])
+            rejected = np.count_nonzero(valid & ~strict)
+            if rejected:
+                log(f"{mesh_name}: dropped {rejected} brushes that failed the strict checks")
+            valid &= strict
+
+        # Brush text is generated and written in chunks, never held for the whole map
+        corners = np.concatenate((v, ve), axis=1)
+        brushes = iter_triangle_brushes(np.flatnonzero(valid), corners, clip, lightmap, guid)
+        count = write_collision_map(filepath, mesh_name, brushes, guid)
+
+    log(f"Collision map exported to:\n{filepath}")
+    return count
+
+
+def export_cached_collision_map(cache_dir, mesh_name, info, filepath, settings, previous_hash=None):
+    """
+    Process pool worker: export one mesh read from the mesh cache, unless
+    its geometry hash equals previous_hash and the map is still there.
+    Returns (mesh_name, brush count or None when skipped, log lines, seconds, hash).
+    """
+    start = time.perf_counter()
+    arrays, info = load_mesh(cache_dir, mesh_name, manifest={"meshes": {mesh_name: info}})
+
+    digest = geometry_hash(mesh_name, arrays["vertices"], arrays["triangles"], info["matrix_world"], settings)
+    if map_is_current(filepath, digest, previous_hash):
+        return mesh_name, None, [], time.perf_counter() - start, digest
+
+    lines = []
+    count = export_collision_map(
+        mesh_name,
+        filepath,
+        arrays["vertices"],
+        arrays["triangles"],
+        info["matrix_world"],
+        settings,
+        log=lines.append
+    )
+    return mesh_name, count, lines, time.perf_counter() - start, digest
@@ -0,0 +1,879 @@
+# Blender-independent collision geometry helpers (NumPy only).
+#
+# Arrays are float32 like mathutils, so the numbers written to .map files
+# match what the old per-triangle Vector code produced.
+
+import heapq
+
+import numpy as np
+
+SCALE = 39.37  # Blender meters → Radiant inches
+EXTRUDE = 0.16  # Brush thickness in Blender meters
+MIN_SIZE = 0.0001  # Smallest area/volume a brush may have
+
+
+def to_world(local_verts, matrix_world):
+    """
+    Convert (N, 3) local vertices → world space → inches, rounding like
+    world() did: matrix_world @ v multiplies in float32 and sums in double
+    (as mathutils does), the float32 result is scaled in double and only
+    then stored as float32 again.
+    """
+    m = np.asarray(matrix_world, dtype=np.float32)
+    local = np.asarray(local_verts, dtype=np.float32)
+    world = np.zeros((len(local), 3))
+    for col in range(3):
+        world += (local[:, col, None] * m[:3, col]).astype(np.float64)
+    world += m[:3, 3]
+    return (world.astype(np.float32).astype(np.float64) * SCALE).astype(np.float32)
+
+
+def normalize_rows(vectors):
+    """
+    Normalize (N, 3) float32 vectors like Vector.normalized(): squared length
+    summed in double from float32 products (z first) and stored as float32,
+    then every component multiplied by the float32 1 / sqrt. Vectors of
+    (near) zero length become zero.
+    """
+    squares = (vectors * vectors).astype(np.float64)
+    length_sq = (squares[:, 2] + squares[:, 1] + squares[:, 0]).astype(np.float32)
+    usable = length_sq > np.float32(1e-35)
+    inverse = np.divide(np.float32(1), np.sqrt(length_sq), out=np.zeros_like(length_sq), where=usable)
+    return vectors * inverse[:, None]
+
+
+def round_coords(coords, decimals=4):
+    """Round like round_vec(): round the value, then store it back as float32."""
+    return np.round(coords.astype(np.float64), decimals).astype(np.float32)
+
+
+def tri_areas(a, b, c):
+    return np.linalg.norm(np.cross(b - a, c - a), axis=-1) / 2
+
+
+def valid_brush_mask(v, ve):
+    """Vectorized is_valid_brush over (T, 3, 3) triangle and extruded triangle corners."""
+    a1, a2, a3 = v[:, 0], v[:, 1], v[:, 2]
+    b1 = ve[:, 0]
+
+    # 1. Triangle must not be degenerate
+    valid = tri_areas(a1, a2, a3) >= MIN_SIZE
+
+    # 2. Extruded triangle must not be degenerate
+    valid &= tri_areas(ve[:, 0], ve[:, 1], ve[:, 2]) >= MIN_SIZE
+
+    # 3. Volume must be positive (signed tetra volume – catches inside-out / zero-thickness)
+    volume = np.abs(np.einsum("ij,ij->i", a2 - a1, np.cross(a3 - a1, b1 - a1))) / 6
+    valid &= volume >= MIN_SIZE
+
+    # 4. Make sure normal is not flipped or NaN
+    normal_length = np.linalg.norm(np.cross(a2 - a1, a3 - a1), axis=-1)
+    valid &= normal_length >= MIN_SIZE
+
+    return valid
+
+
+def triangle_brushes(world_verts, tris, extrude=EXTRUDE):
+    """
+    Build one extruded brush per triangle.
+
+    world_verts are (N, 3) world-space inches and tris (T, 3) vertex indices.
+    Returns (v, ve, valid): the rounded (T, 3, 3) triangle corners, the
+    rounded corners extruded along the face normal, and a mask of the
+    brushes that pass validation.
+    """
+    v = world_verts[tris]
+    normal = normalize_rows(np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0]))
+
+    offset = normal * np.float32(extrude) * np.float32(SCALE)
+    ve = round_coords(v + offset[:, None, :])
+    v = round_coords(v)
+
+    return v, ve, valid_brush_mask(v, ve)
+
+
+# -------------------------
+# STRICT CHECKS
+# -------------------------
+
+# Worst-case move of a point rounded to 4 decimals on all three axes
+ROUND_ERROR = 0.5e-4 * 3 ** 0.5
+
+# Planes of a triangle brush as corner indices into (v1, v2, v3, v1e, v2e, v3e),
+# in format_triangle_brush() order, and the corner each side face should also contain
+TRIANGLE_PLANES = np.array([[0, 1, 2], [3, 5, 4], [0, 3, 4], [1, 4, 5], [2, 5, 3]])
+SIDE_CORNERS = np.array([[2, 1], [3, 2], [4, 0]])  # (plane, fourth corner)
+
+
+def plane_errors(points):
+    """
+    For (..., 3, 3) plane points, return (shortest edge, plane error): how
+    far the plane can tilt at its farthest point because of rounding.
+    """
+    a, b, c = points[..., 0, :], points[..., 1, :], points[..., 2, :]
+    edges = np.stack((b - a, c - b, a - c), axis=-2).astype(np.float64)
+    lengths = np.linalg.norm(edges, axis=-1)
+    cross = np.linalg.norm(np.cross(edges[..., 0, :], -edges[..., 2, :]), axis=-1)
+
+    # Normal tilt (radians) from moving each point by ROUND_ERROR, times the plane's extent
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tilt = ROUND_ERROR * lengths.sum(axis=-1) / cross
+    error = np.where(cross > 0, tilt * lengths.max(axis=-1), np.inf)
+    return lengths.min(axis=-1), error
+
+
+def min_angles(a, b, c):
+    """Smallest interior angle (degrees) of each triangle."""
+    edges = np.stack((b - a, c - b, a - c), axis=1).astype(np.float64)
+    lengths = np.linalg.norm(edges, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cos = -np.einsum("tij,tij->ti", edges, np.roll(edges, 1, axis=1)) / (lengths * np.roll(lengths, 1, axis=1))
+    angles = np.degrees(np.arccos(np.clip(cos, -1, 1)))
+    return np.nan_to_num(angles, nan=0.0).min(axis=1)
+
+
+def strict_brush_mask(v, ve, min_edge=0.05, min_angle=1.0, max_plane_error=0.05):
+    """
+    Stricter checks for the rounded triangle brushes of triangle_brushes(),
+    aimed at the slivers the map compiler rejects although they pass
+    valid_brush_mask(). A brush fails when:
+
+    - any edge is shorter than min_edge inches,
+    - two side faces meet at less than min_angle degrees (the side faces
+      are perpendicular to the caps, so these are the cap's angles),
+    - rounding can tilt one of its planes by more than max_plane_error
+      inches, or a side face's fourth corner is that far off its plane.
+    """
+    corners = np.concatenate((v, ve), axis=1).astype(np.float64)
+    planes = corners[:, TRIANGLE_PLANES]
+
+    shortest, error = plane_errors(planes)
+    valid = (shortest >= min_edge).all(axis=1)
+    valid &= (error <= max_plane_error).all(axis=1)
+
+    valid &= min_angles(v[:, 0], v[:, 1], v[:, 2]) >= min_angle
+    valid &= min_angles(ve[:, 0], ve[:, 1], ve[:, 2]) >= min_angle
+
+    # Side faces are quads but only three corners define the plane
+    side = planes[:, SIDE_CORNERS[:, 0]]
+    normal = np.cross(side[:, :, 1] - side[:, :, 0], side[:, :, 2] - side[:, :, 0])
+    length = np.linalg.norm(normal, axis=-1)
+    fourth = corners[:, SIDE_CORNERS[:, 1]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distance = np.abs(np.einsum("tij,tij->ti", fourth - side[:, :, 0], normal)) / length
+    valid &= (distance <= max_plane_error).all(axis=1)
+
+    return valid
+
+
+def strict_planes_ok(planes, min_edge=0.05, max_plane_error=0.05):
+    """
+    Edge length and plane precision checks of strict_brush_mask() for one
+    brush given as a list of three-point planes (merged or hull brushes,
+    whose face adjacency is not known, so slivers are not angle-checked).
+    """
+    shortest, error = plane_errors(np.asarray(planes, dtype=np.float64))
+    return bool((shortest >= min_edge).all() and (error <= max_plane_error).all())
+
+
+# -------------------------
+# WELDING
+# -------------------------
+
+CELL_BITS = 21  # Bits per axis when packing grid cells into one int64 key
+
+
+# Neighbour cells after the own cell in packing order; with the own cell they
+# cover every pair of neighbouring cells exactly once
+HALF_NEIGHBORHOOD = [
+    (dx, dy, dz)
+    for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+    if (dx, dy, dz) > (0, 0, 0)
+]
+
+
+def weld_vertices(world_verts, tol=0.01):
+    """
+    Weld vertices that lie within tol inches of each other.
+
+    Vertices are bucketed in a spatial hash grid with cells of at least tol,
+    so every pair within tol lies in the same or neighbouring cells. All
+    such pairs are compared, and vertices joined by a chain of close pairs
+    weld to the lowest-numbered vertex among them. Returns the (N,) index
+    each vertex welds to.
+    """
+    verts = world_verts.astype(np.float64)
+    if len(verts) == 0:
+        return np.arange(0)
+
+    low = verts.min(axis=0)
+    span = float((verts.max(axis=0) - low).max())
+    cell_size = max(tol, span / ((1 << CELL_BITS) - 3), 1e-12)
+    cells = np.floor((verts - low) / cell_size).astype(np.int64) + 1
+
+    packed = (cells[:, 0] << (2 * CELL_BITS)) | (cells[:, 1] << CELL_BITS) | cells[:, 2]
+
+    # Packing is linear, so each neighbour cell is the sorted keys plus a
+    # constant, and the vertices in it a range of the sorted order
+    order = np.argsort(packed, kind="stable")
+    keys = packed[order]
+    position = np.arange(len(keys))
+
+    first = []
+    second = []
+    for dx, dy, dz in [(0, 0, 0)] + HALF_NEIGHBORHOOD:
+        wanted = keys + ((dx << (2 * CELL_BITS)) + (dy << CELL_BITS) + dz)
+        start = np.searchsorted(keys, wanted, side="left")
+        stop = np.searchsorted(keys, wanted, side="right")
+        if (dx, dy, dz) == (0, 0, 0):
+            start = position + 1  # Later vertices of the own cell
+        counts = np.maximum(stop - start, 0)
+
+        i = np.repeat(position, counts)
+        j = np.repeat(start - np.cumsum(counts) + counts, counts) + np.arange(len(i))
+        close = np.linalg.norm(verts[order[i]] - verts[order[j]], axis=1) <= tol
+        first.append(order[i[close]])
+        second.append(order[j[close]])
+
+    first = np.concatenate(first)
+    second = np.concatenate(second)
+
+    # Connected components: spread the lowest index over the close pairs,
+    # shortcutting chains (a → b → c) as it goes
+    target = np.arange(len(verts))
+    while True:
+        previous = target.copy()
+        lowest = np.minimum(target[first], target[second])
+        np.minimum.at(target, first, lowest)
+        np.minimum.at(target, second, lowest)
+        target = target[target]
+        if np.array_equal(target, previous):
+            return target
+
+
+def clean_triangles(world_verts, tris, tol=0.01):
+    """
+    Weld vertices within tol inches, then drop triangles that collapsed,
+    exact or welded duplicates, and the second face of back-to-back pairs.
+    Returns (tris, stats) where stats counts what was removed.
+    """
+    tris = weld_vertices(world_verts, tol)[tris]
+
+    degenerate = (tris[:, 0] == tris[:, 1]) | (tris[:, 1] == tris[:, 2]) | (tris[:, 2] == tris[:, 0])
+    kept = np.flatnonzero(~degenerate)
+
+    # The same three vertices in either winding is a duplicate or an opposite-facing twin
+    _, first = np.unique(np.sort(tris[kept], axis=1), axis=0, return_index=True)
+    unique = kept[np.sort(first)]
+
+    stats = {"degenerate": int(degenerate.sum()), "duplicate": len(kept) - len(unique)}
+    return tris[unique], stats
+
+
+# -------------------------
+# QUADRIC SIMPLIFICATION
+# -------------------------
+
+BOUNDARY_WEIGHT = 100.0  # Keeps open borders from being eaten away
+
+
+def _plane_quadrics(planes):
+    """(N, 4) planes (a, b, c, d) → (N, 4, 4) fundamental error quadrics."""
+    return planes[:, :, None] * planes[:, None, :]
+
+
+def _vertex_quadrics(verts, tris):
+    v = verts[tris]
+    normals = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+    planes = np.column_stack((normals, -np.einsum("ij,ij->i", normals, v[:, 0])))
+
+    quadrics = np.zeros((len(verts), 4, 4))
+    face_quadrics = _plane_quadrics(planes)
+    for corner in range(3):
+        np.add.at(quadrics, tris[:, corner], face_quadrics)
+
+    # Edges used by a single triangle get a plane through them, perpendicular to the face
+    edges = np.concatenate((tris[:, [0, 1]], tris[:, [1, 2]], tris[:, [2, 0]]))
+    faces = np.tile(np.arange(len(tris)), 3)
+    _, first, counts = np.unique(np.sort(edges, axis=1), axis=0, return_index=True, return_counts=True)
+    boundary = first[counts == 1]
+    if len(boundary):
+        a, b = verts[edges[boundary, 0]], verts[edges[boundary, 1]]
+        side = np.cross(b - a, normals[faces[boundary]])
+        lengths = np.linalg.norm(side, axis=1, keepdims=True)
+        side = np.divide(side, lengths, out=np.zeros_like(side), where=lengths > 0)
+        side_planes = np.column_stack((side, -np.einsum("ij,ij->i", side, a)))
+        side_quadrics = _plane_quadrics(side_planes) * BOUNDARY_WEIGHT
+        np.add.at(quadrics, edges[boundary, 0], side_quadrics)
+        np.add.at(quadrics, edges[boundary, 1], side_quadrics)
+
+    return quadrics
+
+
+# Upper triangle of a symmetric 4x4 quadric, as the 10 floats the collapse loop works with
+QUADRIC_UPPER = np.triu_indices(4)
+
+
+def _edge_costs(quadrics, verts, a, b):
+    """
+    Vectorized _collapse_cost() for the (E,) edges a-b: the cheapest of
+    keeping a, keeping b or the midpoint, as (E,) errors and (E, 3) positions.
+    """
+    q = quadrics[a] + quadrics[b]
+    candidates = np.stack((verts[a], verts[b], (verts[a] + verts[b]) / 2), axis=1)
+    homogeneous = np.concatenate((candidates, np.ones((len(a), 3, 1))), axis=2)
+    errors = np.einsum("eci,eij,ecj->ec", homogeneous, q, homogeneous)
+    best = np.argmin(errors, axis=1)
+    rows = np.arange(len(a))
+    return np.maximum(errors[rows, best], 0.0), candidates[rows, best]
+
+
+def _point_error(q, x, y, z):
+    """v^T Q v for the point (x, y, z, 1) and a quadric given as its 10 upper triangle floats."""
+    q00, q01, q02, q03, q11, q12, q13, q22, q23, q33 = q
+    return (
+        x * (q00 * x + 2 * (q01 * y + q02 * z + q03))
+        + y * (q11 * y + 2 * (q12 * z + q13))
+        + z * (q22 * z + 2 * q23)
+        + q33
+    )
+
+
+def _collapse_cost(q_a, q_b, p_a, p_b):
+    """Cheapest of keeping a, keeping b or the midpoint, as (error, position); plain floats."""
+    q = [i + j for i, j in zip(q_a, q_b)]
+    best_error = best = None
+    for candidate in (p_a, p_b, [(i + j) / 2 for i, j in zip(p_a, p_b)]):
+        error = _point_error(q, *candidate)
+        if best is None or error < best_error:
+            best_error, best = error, candidate
+    return max(best_error, 0.0), best
+
+
+def _normal(p0, p1, p2):
+    ux, uy, uz = p1[0] - p0[0], p1[1] - p0[1], p1[2] - p0[2]
+    vx, vy, vz = p2[0] - p0[0], p2[1] - p0[1], p2[2] - p0[2]
+    return uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx
+
+
+def _flips_faces(verts, tris, faces, a, b, position):
+    """Whether moving vertices a and b to position turns any face over or flat."""
+    for t in faces:
+        corners = [verts[v] for v in tris[t]]
+        before = _normal(*corners)
+        after = _normal(*(position if v == a or v == b else p for v, p in zip(tris[t], corners)))
+        if before[0] * after[0] + before[1] * after[1] + before[2] * after[2] <= 0:
+            return True
+    return False
+
+
+def simplify_quadric(world_verts, tris, target_ratio=0.5, max_error=1.0):
+    """
+    Simplify a triangle mesh by quadric error edge collapses (Garland-Heckbert).
+
+    Collapses the cheapest edges until only target_ratio of the triangles
+    are left, or until the next collapse would move the surface more than
+    max_error inches (root of the summed squared plane distances). Open
+    borders are weighted so the outline of the mesh holds its shape.
+    Returns (verts, tris) with only the vertices still in use.
+
+    Quadrics and the costs of every edge are computed in NumPy up front; the
+    collapse loop then works on plain Python floats, which for one 4x4
+    quadric at a time is far cheaper than a NumPy call.
+    """
+    tris = np.array(tris, dtype=np.int64)  # A copy: collapses rewrite it in place
+    target = int(len(tris) * target_ratio)
+    if len(tris) == 0 or target >= len(tris):
+        return world_verts, tris
+
+    verts = world_verts.astype(np.float64)
+    quadrics = _vertex_quadrics(verts, tris)
+    max_cost = max_error ** 2
+
+    edges = np.unique(np.sort(np.concatenate((tris[:, [0, 1]], tris[:, [1, 2]], tris[:, [2, 0]])), axis=1), axis=0)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    costs, positions = _edge_costs(quadrics, verts, edges[:, 0], edges[:, 1])
+    heap = [
+        (cost, a, b, 0, 0, position)
+        for cost, (a, b), position in zip(costs.tolist(), edges.tolist(), positions.tolist())
+    ]
+    heapq.heapify(heap)
+
+    quadrics = quadrics[:, QUADRIC_UPPER[0], QUADRIC_UPPER[1]].tolist()
+    verts = verts.tolist()
+    tris = tris.tolist()
+
+    vert_faces = [set() for _ in range(len(verts))]
+    neighbors = [set() for _ in range(len(verts))]
+    for t, (a, b, c) in enumerate(tris):
+        for v in (a, b, c):
+            vert_faces[v].add(t)
+        neighbors[a].update((b, c))
+        neighbors[b].update((a, c))
+        neighbors[c].update((a, b))
+
+    version = [0] * len(verts)
+    alive = [True] * len(tris)
+    remaining = len(tris)
+
+    while heap and remaining > target:
+        cost, a, b, version_a, version_b, position = heapq.heappop(heap)
+        if version[a] != version_a or version[b] != version_b:
+            continue
+        if cost > max_cost:
+            break
+
+        shared = vert_faces[a] & vert_faces[b]
+        if _flips_faces(verts, tris, (vert_faces[a] | vert_faces[b]) - shared, a, b, position):
+            continue
+
+        # Collapse b into a
+        verts[a] = position
+        quadrics[a] = [i + j for i, j in zip(quadrics[a], quadrics[b])]
+        for t in shared:
+            alive[t] = False
+            remaining -= 1
+            for v in tris[t]:
+                vert_faces[v].discard(t)
+        for t in vert_faces[b]:
+            tris[t] = [a if v == b else v for v in tris[t]]
+            vert_faces[a].add(t)
+        vert_faces[b] = set()
+
+        for n in neighbors[b]:
+            neighbors[n].discard(b)
+            if n != a:
+                neighbors[n].add(a)
+                neighbors[a].add(n)
+        neighbors[a].discard(b)
+        neighbors[b] = set()
+
+        version[a] += 1
+        version[b] += 1
+        for n in neighbors[a]:
+            cost, position = _collapse_cost(quadrics[a], quadrics[n], verts[a], verts[n])
+            heapq.heappush(heap, (cost, a, n, version[a], version[n], position))
+
+    tris = np.array(tris, dtype=np.int64)[np.array(alive)]
+    used, tris = np.unique(tris, return_inverse=True)
+    return np.array(verts)[used].astype(np.float32), tris.reshape(-1, 3)
+
+
+# -------------------------
+# COPLANAR MERGING
+# -------------------------
+
+def _edges(loop):
+    return zip(loop, loop[1:] + loop[:1])
+
+
+def _join_loops(p, q, a, b):
+    """Join loop p (with edge a→b) and loop q (with edge b→a) across that edge."""
+    ia = p.index(a)
+    ib = q.index(b)
+    p_from_b = p[ia + 1:] + p[:ia + 1]  # b ... a
+    q_from_a = q[ib + 1:] + q[:ib + 1]  # a ... b
+    loop = p_from_b[:-1] + q_from_a[:-1]
+
+    # Loops sharing more than one edge leave x, y, x spikes where the rest of
+    # the shared boundary was; fold them away
+    folded = True
+    while folded and len(loop) > 3:
+        folded = False
+        for i in range(len(loop)):
+            j = (i + 1) % len(loop)
+            if loop[i - 1] == loop[j]:
+                for k in sorted((i, j), reverse=True):
+                    del loop[k]
+                folded = True
+                break
+
+    return loop if len(set(loop)) == len(loop) else None
+
+
+def _is_convex(points, normal, eps=1e-6):
+    edges = np.roll(points, -1, axis=0) - points
+    turns = np.cross(edges, np.roll(edges, -1, axis=0)) @ normal
+    lengths = np.linalg.norm(edges, axis=1)
+    return bool(np.all(turns >= -eps * lengths * np.roll(lengths, -1)))
+
+
+def _merge_group(world, loops, normal):
+    """Greedily merge loops across shared edges while the result stays convex."""
+    polys = dict(enumerate(loops))
+    owner = {}
+    for pid, loop in polys.items():
+        for edge in _edges(loop):
+            owner[edge] = pid
+
+    merged_any = True
+    while merged_any:
+        merged_any = False
+        for (a, b), pid in list(owner.items()):
+            if owner.get((a, b)) != pid:
+                continue
+            qid = owner.get((b, a))
+            if qid is None or qid == pid:
+                continue
+
+            loop = _join_loops(polys[pid], polys[qid], a, b)
+            if loop is None or not _is_convex(world[loop], normal):
+                continue
+
+            for edge in list(_edges(polys[pid])) + list(_edges(polys[qid])):
+                owner.pop(edge, None)
+            for edge in _edges(loop):
+                owner[edge] = pid
+            polys[pid] = loop
+            del polys[qid]
+            merged_any = True
+
+    return list(polys.values())
+
+
+def merge_coplanar(world_verts, tris, angle_tolerance=0.5, distance_tolerance=0.01):
+    """
+    Group adjacent coplanar triangles into convex polygons.
+
+    Triangles count as coplanar when their normals are within
+    angle_tolerance degrees and their plane offsets within
+    distance_tolerance inches; they are adjacent when they share an edge
+    (by vertex index). Yields (loop, normal) per polygon, one plane group
+    at a time, where loop lists vertex indices in the triangles' winding.
+    """
+    world = world_verts.astype(np.float64)
+    v = world[tris]
+    normals = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+
+    # Degenerate triangles would only make invalid brushes
+    keep = lengths > 0
+    tris, v, normals = tris[keep], v[keep], normals[keep] / lengths[keep, None]
+    offsets = np.einsum("ij,ij->i", normals, v[:, 0])
+
+    keys = np.column_stack((normals / np.radians(angle_tolerance), offsets / distance_tolerance))
+    _, group_of, counts = np.unique(np.round(keys).astype(np.int64), axis=0, return_inverse=True, return_counts=True)
+
+    order = np.argsort(group_of.reshape(-1), kind="stable")
+    start = 0
+    for count in counts.tolist():
+        members = order[start:start + count]
+        start += count
+
+        normal = normals[members].mean(axis=0)
+        normal /= max(np.linalg.norm(normal), 1e-12)
+
+        loops = [list(tri) for tri in tris[members].tolist()]
+        if count > 1:
+            loops = _merge_group(world, loops, normal)
+        for loop in loops:
+            yield loop, normal
+
+
+def polygon_brush_planes(world_verts, loop, normal, extrude=EXTRUDE):
+    """
+    Planes of the brush extruding a convex polygon along normal, as lists
+    of three rounded points: top, bottom, then one side per edge (same
+    winding as the per-triangle brushes). Returns None for brushes that
+    would be degenerate.
+    """
+    points = world_verts[loop].astype(np.float32)
+
+    # Collinear vertices would give zero-area side planes
+    edges = np.roll(points, -1, axis=0) - points
+    turns = np.linalg.norm(np.cross(np.roll(edges, 1, axis=0), edges), axis=1)
+    points = points[turns > 1e-6]
+    if len(points) < 3:
+        return None
+
+    offset = (normal.astype(np.float32) * np.float32(extrude) * np.float32(SCALE)).astype(np.float32)
+    top = round_coords(points)
+    bottom = round_coords(points + offset)
+
+    # Rounding can collapse neighbouring vertices
+    keep = np.any(top != np.roll(top, -1, axis=0), axis=1)
+    top, bottom = top[keep], bottom[keep]
+    k = len(top)
+    if k < 3:
+        return None
+
+    area = np.linalg.norm(np.cross(top - top[0], np.roll(top, -1, axis=0) - top[0]).sum(axis=0)) / 2
+    thickness = abs(float((bottom[0] - top[0]) @ normal))
+    if area < MIN_SIZE or area * thickness < MIN_SIZE:
+        return None
+
+    # Spread the three points defining the top/bottom planes around the polygon
+    i, j, l = 0, k // 3, (2 * k) // 3
+    top = top.tolist()
+    bottom = bottom.tolist()
+
+    planes = [
+        (top[i], top[j], top[l]),
+        (bottom[i], bottom[l], bottom[j]),
+    ]
+    for n in range(k):
+        m = (n + 1) % k
+        planes.append((top[n], bottom[n], bottom[m]))
+    return planes
+
+
+# -------------------------
+# CONVEX DECOMPOSITION
+# -------------------------
+
+HULL_DIRECTIONS = 256  # Sample directions used to thin out large point sets
+CONCAVITY_SAMPLES = 20000  # Default cap on surface samples scored per piece
+CONCAVITY_CHUNK = 4096  # Samples tested against every hull face per batch
+
+
+def _sphere_directions(count):
+    """Evenly spread unit vectors (Fibonacci sphere)."""
+    i = np.arange(count) + 0.5
+    z = 1 - 2 * i / count
+    r = np.sqrt(1 - z * z)
+    theta = np.pi * (1 + 5 ** 0.5) * i
+    return np.column_stack((r * np.cos(theta), r * np.sin(theta), z))
+
+
+def _face_planes(points, faces):
+    a, b, c = points[faces[:, 0]], points[faces[:, 1]], points[faces[:, 2]]
+    normals = np.cross(b - a, c - a)
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+    return normals, np.einsum("ij,ij->i", normals, a)
+
+
+def convex_hull(points):
+    """
+    Incremental 3D convex hull. Returns (hull_points, faces) with faces
+    wound so their normals point outwards, or None if the points are flat.
+    """
+    points = np.unique(points.astype(np.float64), axis=0)
+    if len(points) > 2 * HULL_DIRECTIONS:
+        extremes = np.argmax(points @ _sphere_directions(HULL_DIRECTIONS).T, axis=0)
+        points = points[np.unique(extremes)]
+    if len(points) < 4:
+        return None
+
+    eps = 1e-9 * max(float(np.ptp(points, axis=0).max()), 1.0)
+
+    # Starting tetrahedron from well separated points
+    i0 = int(np.argmin(points[:, 0]))
+    i1 = int(np.argmax(np.linalg.norm(points - points[i0], axis=1)))
+    line = points[i1] - points[i0]
+    i2 = int(np.argmax(np.linalg.norm(np.cross(points - points[i0], line), axis=1)))
+    normal = np.cross(line, points[i2] - points[i0])
+    heights = (points - points[i0]) @ normal
+    i3 = int(np.argmax(np.abs(heights)))
+    if abs(heights[i3]) <= eps * max(np.linalg.norm(normal), eps):
+        return None
+
+    if heights[i3] > 0:
+        i1, i2 = i2, i1
+    faces = np.array([(i0, i1, i2), (i0, i3, i1), (i1, i3, i2), (i2, i3, i0)])
+
+    for p in range(len(points)):
+        if p in (i0, i1, i2, i3):
+            continue
+        normals, offsets = _face_planes(points, faces)
+        visible = normals @ points[p] - offsets > eps
+        if not visible.any():
+            continue
+
+        visible_edges = {
+            edge
+            for a, b, c in faces[visible].tolist()
+            for edge in ((a, b), (b, c), (c, a))
+        }
+        horizon = [(a, b) for a, b in visible_edges if (b, a) not in visible_edges]
+        new_faces = np.array([(a, b, p) for a, b in horizon])
+        faces = np.concatenate((faces[~visible], new_faces))
+
+    used, faces = np.unique(faces, return_inverse=True)
+    return points[used], faces.reshape(-1, 3)
+
+
+def _hull_volume(points, faces):
+    """Volume enclosed by outward faces (divergence theorem)."""
+    a, b, c = points[faces[:, 0]], points[faces[:, 1]], points[faces[:, 2]]
+    return abs(np.einsum("ij,ij->i", a, np.cross(b, c)).sum()) / 6
+
+
+def _hull_concavity(hull, samples, directions):
+    """
+    How far the surface sits inside its hull: for each sample, the distance
+    to the hull along the surface normal, taking the nearer of the two
+    sides. Surface that forms part of the hull scores 0.
+    """
+    if hull is None or len(samples) == 0:
+        return 0.0
+    normals, offsets = _face_planes(*hull)
+
+    # (samples x hull faces) matrices, CONCAVITY_CHUNK samples at a time
+    worst = 0.0
+    for start in range(0, len(samples), CONCAVITY_CHUNK):
+        chunk = samples[start:start + CONCAVITY_CHUNK]
+        chunk_directions = directions[start:start + CONCAVITY_CHUNK]
+        gaps = np.maximum(offsets[None, :] - chunk @ normals.T, 0)
+
+        depth = np.full(len(chunk), np.inf)
+        for sign in (1, -1):
+            facing = sign * chunk_directions @ normals.T
+            with np.errstate(divide="ignore", invalid="ignore"):
+                distance = np.where(facing > 1e-9, gaps / facing, np.inf)
+            depth = np.minimum(depth, distance.min(axis=1))
+        depth = depth[np.isfinite(depth)]
+        if len(depth):
+            worst = max(worst, float(depth.max()))
+    return worst
+
+
+def _surface_samples(v, lo, hi, max_samples=CONCAVITY_SAMPLES):
+    """
+    Centroid and three inner points of each triangle inside the box, with
+    the triangle normals; at most max_samples of them, evenly spread over
+    the triangles so the same part always gets the same samples.
+    """
+    normals = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+    centroids = v.mean(axis=1)
+    samples = np.concatenate([centroids] + [(centroids + v[:, k]) / 2 for k in range(3)])
+    directions = np.tile(normals, (4, 1))
+    inside = np.flatnonzero(np.all((samples >= lo) & (samples <= hi), axis=1))
+    if len(inside) > max_samples:
+        inside = inside[np.linspace(0, len(inside) - 1, max_samples).astype(np.int64)]
+    return samples[inside], directions[inside]
+
+
+def _clip_to_box(v, lo, hi, eps=1e-9):
+    """
+    Surface points of the (T, 3, 3) triangles inside the box lo..hi: corners
+    in the box plus the points where triangle edges cross its faces.
+    """
+    corners = v.reshape(-1, 3)
+    points = [corners]
+
+    starts = corners
+    ends = np.roll(v, -1, axis=1).reshape(-1, 3)
+    delta = ends - starts
+    for axis in range(3):
+        for bound in (lo[axis], hi[axis]):
+            if not np.isfinite(bound):
+                continue
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = (bound - starts[:, axis]) / delta[:, axis]
+            crossing = (t > 0) & (t < 1)
+            points.append(starts[crossing] + t[crossing, None] * delta[crossing])
+
+    points = np.concatenate(points)
+    inside = np.all((points >= lo - eps) & (points <= hi + eps), axis=1)
+    return points[inside]
+
+
+def _part_hull(world, tris, part, lo, hi, extrude, max_samples):
+    """(hull, concavity, flat) for the triangles in part, clipped to the box lo..hi."""
+    v = world[tris[part]]
+    points = _clip_to_box(v, lo, hi)
+    hull = convex_hull(points) if len(points) else None
+    flat = hull is None
+    if flat and len(points):
+        # Flat pieces get the same thickness as a per-triangle brush
+        normal = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0]).sum(axis=0)
+        normal /= max(np.linalg.norm(normal), 1e-12)
+        hull = convex_hull(np.concatenate((points, points + normal * extrude * SCALE)))
+
+    samples, directions = _surface_samples(v, lo, hi, max_samples)
+    return hull, _hull_concavity(hull, samples, directions), flat
+
+
+def convex_decompose(world_verts, tris, max_hulls=8, concavity_tolerance=2.0, extrude=EXTRUDE, max_samples=CONCAVITY_SAMPLES):
+    """
+    Approximate convex decomposition in the spirit of V-HACD.
+
+    Starting from the hull of the whole mesh, the part whose surface lies
+    deepest inside its hull is cut in two by the axis-aligned plane (three
+    candidates per axis) that leaves the least concavity. Triangles crossing
+    a cut are clipped to each side. This repeats until every part is within
+    concavity_tolerance inches of its hull or max_hulls is reached.
+    Concavity is scored on at most max_samples surface points per piece.
+    Returns a list of hulls as (points, faces).
+    """
+    world = world_verts.astype(np.float64)
+    tris = np.asarray(tris)
+    if len(tris) == 0:
+        return []
+
+    v = world[tris]
+    tri_min = v.min(axis=1)
+    tri_max = v.max(axis=1)
+
+    everything = np.arange(len(tris))
+    lo = np.full(3, -np.inf)
+    hi = np.full(3, np.inf)
+    hull, concavity, flat = _part_hull(world, tris, everything, lo, hi, extrude, max_samples)
+    parts = [(-concavity, 0, everything, lo, hi, hull, flat)]
+    counter = 1
+
+    while len(parts) < max_hulls:
+        worst = min(range(len(parts)), key=lambda k: parts[k][:2])
+        concavity, _, part, lo, hi, _, flat = parts[worst]
+        if -concavity <= concavity_tolerance:
+            break
+
+        points = _clip_to_box(v[part], lo, hi)
+        best = None
+        for axis in range(3):
+            for cut in np.unique(np.quantile(points[:, axis], (0.25, 0.5, 0.75))):
+                left_hi = hi.copy()
+                left_hi[axis] = cut
+                right_lo = lo.copy()
+                right_lo[axis] = cut
+                sides = (
+                    (part[tri_min[part, axis] < cut], lo, left_hi),
+                    (part[tri_max[part, axis] > cut], right_lo, hi),
+                )
+                if any(len(piece) == 0 for piece, _, _ in sides):
+                    continue
+
+                pieces = [
+                    (piece, piece_lo, piece_hi, *_part_hull(world, tris, piece, piece_lo, piece_hi, extrude, max_samples))
+                    for piece, piece_lo, piece_hi in sides
+                ]
+                # Cutting a solid must not leave a flat sliver that would need extruding
+                if not flat and any(piece[-1] for piece in pieces):
+                    continue
+                cost = sum(piece[4] for piece in pieces)
+                if best is None or cost < best[0]:
+                    best = (cost, pieces)
+
+        if best is None:
+            break
+
+        del parts[worst]
+        for piece, piece_lo, piece_hi, piece_hull, piece_concavity, piece_flat in best[1]:
+            parts.append((-piece_concavity, counter, piece, piece_lo, piece_hi, piece_hull, piece_flat))
+            counter += 1
+
+    return [part[5] for part in parts if part[5] is not None]
+
+
+def hull_brush_planes(points, faces):
+    """
+    Planes of the brush for one hull, as lists of three rounded points with
+    the same inward winding as the per-triangle brushes. Coplanar hull faces
+    share one plane. Returns None for hulls too small to keep.
+    """
+    normals, offsets = _face_planes(points, faces)
+    keys = np.round(np.column_stack((normals * 1e4, offsets * 1e2))).astype(np.int64)
+    _, first = np.unique(keys, axis=0, return_index=True)
+    first = np.sort(first)
+
+    if len(first) < 4 or _hull_volume(points, faces) < MIN_SIZE:
+        return None
+
+    corners = round_coords(points[faces[first]]).tolist()
+    return [(a, c, b) for a, b, c in corners]
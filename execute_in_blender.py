@@ -1,6 +1,7 @@
 import os
 import subprocess
 import json
+import time
 
 script_dir = os.path.dirname(os.path.realpath(__file__))
 json_path = os.path.join(script_dir, "data.json")
@@ -13,10 +14,110 @@ blender_exe_path = data.get("blender_exe_path")
 blender_file_path = data.get("blender_file_path")
 combine_materials_script_path = data.get("combine_materials_script_path")
 export_xmodel_script_path = data.get("export_xmodel_script_path")
+mesh_names = data.get("mesh_names")
+texture_export_path = data.get("texture_export_path")
+bake_script_path = data.get("bake_script_path", os.path.join(script_dir, "bake_single_texture.py"))
+# Bake farm: number of background Blender processes baking mesh_names on the CPU (0 = no bake)
+bake_workers = data.get("bake_workers", 0)
+bake_threads = data.get("bake_threads", 0)  # Render threads per process, 0 = cores / bake_workers
+bake_retries = data.get("bake_retries", 1)  # Extra attempts for meshes whose shard failed
+bake_log_dir = data.get("bake_log_dir", os.path.join(script_dir, "bake_logs"))
+# Atlas layout from plan_atlases.py; each atlas is baked whole by one process
+atlas_layout_path = data.get("atlas_layout_path")
 
 env = os.environ.copy()
 env["CYCLES_DEVICE_TYPE"] = "OPTIX"
 
+
+def load_texture_names(mesh_names):
+    """Texture each mesh bakes into: its own, or its atlas from atlas_layout_path."""
+    textures = {name: name for name in mesh_names}
+    if atlas_layout_path and os.path.exists(atlas_layout_path):
+        with open(atlas_layout_path, "r", encoding="utf-8") as f:
+            layout = json.load(f)
+        for name, entry in layout["meshes"].items():
+            if name in textures:
+                textures[name] = entry["atlas"]
+    return textures
+
+
+def split_shards(names, workers, textures):
+    """
+    Split names into at most workers non-empty shards of similar size,
+    keeping the meshes of one texture (an atlas) together.
+    """
+    groups = {}
+    for name in names:
+        groups.setdefault(textures[name], []).append(name)
+
+    # Biggest groups first, each to the smallest shard so far
+    shards = [[] for _ in range(max(1, min(workers, len(groups))))]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(shards, key=len).extend(group)
+    return shards
+
+
+def baked_since(texture_name, started):
+    path = os.path.join(texture_export_path, f"{texture_name}.tif")
+    return os.path.exists(path) and os.path.getmtime(path) >= started
+
+
+def run_bake_farm(mesh_names, workers):
+    """
+    Bake mesh_names with one background Blender per shard, then retry the
+    meshes whose shard failed or left no fresh .tif. Each process logs to
+    bake_log_dir. Returns the mesh names that still failed.
+    """
+    os.makedirs(bake_log_dir, exist_ok=True)
+    threads = bake_threads or max(1, (os.cpu_count() or 1) // workers)
+    start = time.perf_counter()
+    textures = load_texture_names(mesh_names)
+
+    pending = list(mesh_names)
+    for attempt in range(bake_retries + 1):
+        shards = split_shards(pending, workers, textures)
+        print(f"Bake attempt {attempt + 1}: {len(pending)} meshes in {len(shards)} shards, {threads} threads each")
+
+        running = []
+        for index, shard in enumerate(shards):
+            shard_path = os.path.join(bake_log_dir, f"shard_{index}.json")
+            with open(shard_path, "w") as f:
+                json.dump(shard, f)
+
+            log_path = os.path.join(bake_log_dir, f"shard_{index}_attempt_{attempt + 1}.log")
+            log = open(log_path, "w")
+            cmd = [
+                blender_exe_path,
+                "--background", blender_file_path,
+                "--threads", str(threads),
+                "--python-exit-code", "1",
+                "--python", bake_script_path,
+                "--", "--mesh-list", shard_path, "--device", "CPU"
+            ]
+            running.append((shard, log_path, log, time.time(), subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, env=env)))
+
+        pending = []
+        for shard, log_path, log, started, process in running:
+            code = process.wait()
+            log.close()
+
+            # A mesh only counts as baked if its texture was written during this run
+            missing = [name for name in shard if not baked_since(textures[name], started)]
+            if missing:
+                print(f"Shard failed (exit code {code}, {len(missing)} of {len(shard)} meshes missing), see {log_path}")
+                pending.extend(missing)
+            else:
+                print(f"Shard done: {len(shard)} meshes (exit code {code}), see {log_path}")
+
+        if not pending:
+            break
+
+    print(f"Baked {len(mesh_names) - len(pending)} of {len(mesh_names)} meshes ({time.perf_counter() - start:.1f} s)")
+    for name in pending:
+        print(f"Bake failed: {name}")
+    return pending
+
+
 cmd = [
     blender_exe_path,
     "--background", blender_file_path,
@@ -26,6 +127,9 @@ cmd = [
 
 subprocess.run(cmd, env=env)
 
+if bake_workers:
+    run_bake_farm(mesh_names, bake_workers)
+
 # Execute script to export each mesh as xmodel
 cmd = [
     blender_exe_path,
@@ -33,4 +137,4 @@ cmd = [
     "--python", export_xmodel_script_path
 ]
 
-subprocess.run(cmd, env=env)
\ No newline at end of file
+subprocess.run(cmd, env=env)
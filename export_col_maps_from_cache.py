@@ -0,0 +1,81 @@
+# Write the collision maps of create_col_maps.py from the mesh cache
+# (extract_mesh_cache.py) with plain python, one mesh per worker process:
+#   python export_col_maps_from_cache.py
+
+import os
+import sys
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+script_dir = os.path.dirname(os.path.realpath(__file__))
+if script_dir not in sys.path:
+    sys.path.append(script_dir)
+
+from collision_export import collision_settings, export_cached_collision_map, load_map_manifest, save_map_manifest
+from mesh_cache import check_mesh_cache, load_manifest
+
+json_path = os.path.join(script_dir, "data.json")
+
+with open(json_path, "r") as f:
+    data = json.load(f)
+
+coll_maps_dir = data.get("coll_maps_dir")
+mesh_names = data.get("mesh_names")
+mesh_cache_dir = data.get("mesh_cache_dir")
+# Worker processes; None uses every core
+collision_workers = data.get("collision_workers")
+# Rebuild every map even if its geometry hash is unchanged
+rebuild_collision = data.get("rebuild_collision", False)
+# Export from cached meshes whose .blend changed since extract_mesh_cache.py, with a warning
+allow_stale_mesh_cache = data.get("allow_stale_mesh_cache", False)
+
+
+def export_collision_maps(mesh_names, workers=None):
+    start = time.perf_counter()
+    settings = collision_settings(data)
+    manifest = load_manifest(mesh_cache_dir)
+    map_manifest = load_map_manifest(coll_maps_dir)
+
+    for mesh_name in mesh_names:
+        if mesh_name not in manifest["meshes"]:
+            raise Exception(f"Mesh '{mesh_name}' not found.")
+    check_mesh_cache(manifest, mesh_names, allow_stale_mesh_cache)
+
+    # Biggest meshes first so one large map does not finish last on its own
+    ordered = sorted(mesh_names, key=lambda name: manifest["meshes"][name]["triangle_count"], reverse=True)
+
+    total = 0
+    rebuilt = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                export_cached_collision_map,
+                mesh_cache_dir,
+                mesh_name,
+                manifest["meshes"][mesh_name],
+                os.path.join(coll_maps_dir, f"{mesh_name}.map"),
+                settings,
+                None if rebuild_collision else map_manifest.get(mesh_name)
+            )
+            for mesh_name in ordered
+        ]
+
+        # Each worker's messages are printed together once its map is done
+        for future in as_completed(futures):
+            mesh_name, count, lines, seconds, digest = future.result()
+            map_manifest[mesh_name] = digest
+            if count is None:
+                continue
+
+            print("\n".join(lines))
+            print(f"{mesh_name}: {count} brushes in {seconds:.2f} s")
+            total += count
+            rebuilt += 1
+
+    save_map_manifest(coll_maps_dir, map_manifest)
+    print(f"\nRebuilt {rebuilt} collision maps ({total} brushes), reused {len(mesh_names) - rebuilt} unchanged ({time.perf_counter() - start:.2f} s)")
+
+
+if __name__ == "__main__":
+    export_collision_maps(mesh_names, collision_workers)
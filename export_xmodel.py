@@ -2,9 +2,15 @@ import bpy
 import os
 import sys
 import json
+import numpy as np
 
 
 script_dir = os.path.dirname(os.path.realpath(__file__))
+if script_dir not in sys.path:
+    sys.path.append(script_dir)
+
+from bake_utils import atlas_uvs, load_atlas_layout
+
 json_path = os.path.join(script_dir, "data.json")
 
 with open(json_path, "r") as f:
@@ -19,6 +25,8 @@ island_margin = data.get("island_margin")
 bake_margin = data.get("bake_margin")
 samples = data.get("samples")
 single_material = data.get("single_material")
+# Meshes in the plan_atlases.py layout use their shared atlas texture
+atlas_layout = load_atlas_layout(data.get("atlas_layout_path"))
 
 def get_materials():
     # Bake textures to one texture
@@ -72,6 +80,16 @@ def get_materials():
         print(f"Completed new Smart UV Project")
 
         bpy.ops.object.mode_set(mode='OBJECT')        
+
+        # Same tile of the atlas the mesh was baked into
+        atlas_entry = atlas_layout["meshes"].get(mesh_name) if atlas_layout else None
+        texture_name = mesh_name
+        if atlas_entry:
+            uv = np.empty(len(new_uv.data) * 2, dtype=np.float32)
+            new_uv.data.foreach_get("uv", uv)
+            new_uv.data.foreach_set("uv", atlas_uvs(uv.reshape(-1, 2), atlas_entry).ravel())
+            texture_name = atlas_entry["atlas"]
+            print(f"Moved UVs into {texture_name} tile")
         
         # Replace materials with baked one
 
@@ -93,6 +111,15 @@ def get_materials():
         # Create new nodes
         # tex_node = nodes.new(type='ShaderNodeTexImage')
         # tex_node.image = img
+        if atlas_entry:
+            # Shared by every mesh of an atlas, so only loaded once
+            img = bpy.data.images.get(texture_name)
+            if img is None:
+                img = bpy.data.images.load(os.path.join(texture_export_path, f"{texture_name}.tif"), check_existing=True)
+                img.name = texture_name
+            tex_node = nodes.new(type='ShaderNodeTexImage')
+            tex_node.image = img
+            tex_node.location = (-400, 0)
         bsdf_node = nodes.new(type='ShaderNodeBsdfPrincipled')
         output_node = nodes.new(type='ShaderNodeOutputMaterial')
 
@@ -104,6 +131,8 @@ def get_materials():
         # Connect texture to base color
         # links.new(tex_node.outputs['Color'], bsdf_node.inputs['Base Color'])
         links.new(bsdf_node.outputs['BSDF'], output_node.inputs['Surface'])
+        if atlas_entry:
+            links.new(tex_node.outputs['Color'], bsdf_node.inputs['Base Color'])
 
         obj.data.materials.append(baked_mat)
 
@@ -118,7 +147,7 @@ def get_materials():
         else:
             print(f"No UV map named '{old_uv_name}' found")
 
-        print(f"Replaced materials with baked texture: {mesh_name}.tif")       
+        print(f"Replaced materials with baked texture: {texture_name}.tif")       
 
 if single_material:
     get_materials()
@@ -0,0 +1,104 @@
+# Dump every mesh in mesh_names to the geometry cache (see mesh_cache.py) so
+# later stages can read it without opening the .blend in Blender.
+
+import bpy
+import os
+import sys
+import json
+import numpy as np
+
+script_dir = os.path.dirname(os.path.realpath(__file__))
+if script_dir not in sys.path:
+    sys.path.append(script_dir)
+
+from mesh_cache import blend_state, load_manifest, save_manifest, save_mesh
+
+json_path = os.path.join(script_dir, "data.json")
+
+with open(json_path, "r") as f:
+    data = json.load(f)
+
+mesh_names = data.get("mesh_names")
+mesh_cache_dir = data.get("mesh_cache_dir")
+
+
+def material_info(mat):
+    """Material name plus the images of its image texture nodes, in node order."""
+    if not mat:
+        return None
+
+    images = []
+    if mat.use_nodes:
+        for node in mat.node_tree.nodes:
+            if node.type == 'TEX_IMAGE' and node.image:
+                images.append({
+                    "name": node.image.name,
+                    "filepath": bpy.path.abspath(node.image.filepath) if node.image.filepath else ""
+                })
+
+    return {"name": mat.name, "use_nodes": mat.use_nodes, "images": images}
+
+
+def extract_mesh(obj):
+    mesh = obj.data
+    mesh.calc_loop_triangles()
+
+    verts = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", verts)
+    verts = verts.reshape(-1, 3)
+
+    tri_count = len(mesh.loop_triangles)
+    tris = np.empty(tri_count * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", tris)
+    loops = np.empty(tri_count * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("loops", loops)
+    material_indices = np.empty(tri_count, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("material_index", material_indices)
+
+    matrix = np.array(obj.matrix_world, dtype=np.float32)
+
+    # World-space vertices are not stored; mesh_cache.world_vertices() derives them
+    arrays = {
+        "vertices": verts,
+        "triangles": tris.reshape(-1, 3),
+        "material_indices": material_indices,
+    }
+
+    # Per-corner UVs of each triangle, one array per UV layer
+    for index, layer in enumerate(mesh.uv_layers):
+        uv = np.empty(len(layer.data) * 2, dtype=np.float32)
+        layer.data.foreach_get("uv", uv)
+        arrays[f"uv{index}"] = uv.reshape(-1, 2)[loops].reshape(-1, 3, 2)
+
+    info = {
+        "matrix_world": matrix.tolist(),
+        "vertex_count": len(verts),
+        "triangle_count": tri_count,
+        "uv_layers": [layer.name for layer in mesh.uv_layers],
+        "active_uv": mesh.uv_layers.active_index if mesh.uv_layers else -1,
+        "materials": [material_info(slot.material) for slot in obj.material_slots],
+    }
+    return arrays, info
+
+
+if not bpy.data.filepath:
+    raise Exception("Save the .blend before caching its meshes.")
+
+# Readers compare this with the .blend on disk to spot a stale cache
+source = blend_state(bpy.data.filepath)
+
+os.makedirs(mesh_cache_dir, exist_ok=True)
+manifest = load_manifest(mesh_cache_dir)
+
+for mesh_name in mesh_names:
+    obj = bpy.data.objects.get(mesh_name)
+    if not obj or obj.type != 'MESH':
+        raise Exception(f"Mesh '{mesh_name}' not found.")
+
+    arrays, info = extract_mesh(obj)
+    info["source"] = source
+    save_mesh(mesh_cache_dir, mesh_name, arrays, info, manifest)
+    print(f"Cached {mesh_name}: {info['vertex_count']} vertices, {info['triangle_count']} triangles")
+
+save_manifest(mesh_cache_dir, manifest)
+print(f"Mesh cache written to {mesh_cache_dir}")
@@ -0,0 +1,504 @@
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from string import Formatter
+
+# Header line:  "name" ( "type.gdf" )
+HEADER_RE = re.compile(rb'^\s*"([^"]*)"\s*\(\s*"([^"]*)"\s*\)\s*$')
+
+READ_BUFFER = 1 << 20  # 1 MiB read/write buffers
+INDEX_SUFFIX = ".idx.json"  # header index stored next to the GDT
+
+# name/gdf are decoded strings; start/end are byte offsets of the block
+# (header line through closing brace) in the source file
+GdtBlock = namedtuple("GdtBlock", ["name", "gdf", "start", "end"])
+
+
+def parse_header(line):
+    """Return (name, gdf) for a GDT header line, or None."""
+    match = HEADER_RE.match(line)
+    if not match:
+        return None
+    return match.group(1).decode("utf-8"), match.group(2).decode("utf-8")
+
+
+def iter_gdt(f):
+    """
+    Stream a GDT opened in binary mode one block at a time.
+
+    Yields (block, chunk) pairs where chunk is the raw bytes and block is a
+    GdtBlock for asset blocks or None for text between blocks. Only the
+    current block is held in memory, however large the file is.
+    """
+    lines_in = iter(f)
+    offset = 0
+    pending = None  # line read ahead while looking for a block's "{"
+
+    while True:
+        line = pending if pending is not None else next(lines_in, b"")
+        pending = None
+        if not line:
+            return
+
+        header = parse_header(line)
+        if header is None:
+            yield None, line
+            offset += len(line)
+            continue
+
+        # Expect next non-empty line to be "{"
+        lines = [line]
+        nxt = next(lines_in, b"")
+        while nxt and nxt.strip() == b"":
+            lines.append(nxt)
+            nxt = next(lines_in, b"")
+
+        if nxt.strip() != b"{":
+            chunk = b"".join(lines)
+            yield None, chunk
+            offset += len(chunk)
+            pending = nxt
+            continue
+
+        lines.append(nxt)
+        depth = 1
+        while depth > 0:
+            nxt = next(lines_in, b"")
+            if not nxt:
+                break
+            lines.append(nxt)
+            stripped = nxt.strip()
+            if stripped == b"{":
+                depth += 1
+            elif stripped == b"}":
+                depth -= 1
+
+        chunk = b"".join(lines)
+        yield GdtBlock(header[0], header[1], offset, offset + len(chunk)), chunk
+        offset += len(chunk)
+
+
+def normalize_block(chunk):
+    """Block bytes with indentation, line endings and blank lines removed."""
+    return b"\n".join(line.strip() for line in chunk.splitlines() if line.strip())
+
+
+def block_digest(chunk):
+    """Hash of a block's normalized body; the header line is left out."""
+    normalized = normalize_block(chunk)
+    newline = normalized.find(b"\n")
+    body = normalized[newline + 1:] if newline != -1 else b""
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+def filter_gdt(input_path, output_path, keep):
+    """
+    Copy input_path to output_path, dropping every block for which
+    keep(block, chunk) returns False. Writing over the input goes through a
+    temp file and an atomic rename.
+    """
+    in_place = os.path.abspath(input_path) == os.path.abspath(output_path)
+    write_path = output_path + ".tmp" if in_place else output_path
+
+    kept = dropped = 0
+    with open(input_path, "rb", buffering=READ_BUFFER) as src, \
+            open(write_path, "wb", buffering=READ_BUFFER) as dst:
+        for block, chunk in iter_gdt(src):
+            if block is not None:
+                if not keep(block, chunk):
+                    dropped += 1
+                    continue
+                kept += 1
+            dst.write(chunk)
+
+    if in_place:
+        os.replace(write_path, output_path)
+
+    return kept, dropped
+
+
+def dedupe_gdt(input_path, output_path):
+    """Drop every block whose name and gdf type were already seen."""
+    seen = set()
+
+    def keep(block, chunk):
+        key = (block.name, block.gdf)
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    return filter_gdt(input_path, output_path, keep)
+
+
+def dedupe_gdt_by_content(input_path, output_path):
+    """
+    Drop repeated headers like dedupe_gdt, and also every block whose body is
+    identical to an earlier block of the same gdf type under another name.
+
+    Only one digest per distinct block is kept in memory. Returns
+    (kept, dropped, aliases) with aliases mapping (alias name, gdf) to the
+    name of the block that was kept.
+    """
+    seen = set()
+    canonical = {}  # (gdf, digest) -> name
+    aliases = {}
+
+    def keep(block, chunk):
+        key = (block.name, block.gdf)
+        if key in seen:
+            return False
+
+        digest = (block.gdf, block_digest(chunk))
+        original = canonical.get(digest)
+        if original is not None:
+            aliases[key] = original
+            return False
+
+        seen.add(key)
+        canonical[digest] = block.name
+        return True
+
+    kept, dropped = filter_gdt(input_path, output_path, keep)
+    return kept, dropped, aliases
+
+
+# -------------------------
+# MULTI-FILE DEDUP
+# -------------------------
+
+def find_gdt_files(source_dir):
+    """Every .gdt under source_dir, sorted so the first copy of a duplicate is stable."""
+    paths = []
+    for root, _, files in os.walk(source_dir):
+        paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(".gdt"))
+    return sorted(paths)
+
+
+def index_gdt_file(gdt_path):
+    """Return (gdt_path, [(name, gdf, digest), ...]) for every block in one GDT."""
+    entries = []
+    with open(gdt_path, "rb", buffering=READ_BUFFER) as f:
+        for block, chunk in iter_gdt(f):
+            if block is not None:
+                entries.append((block.name, block.gdf, block_digest(chunk)))
+    return gdt_path, entries
+
+
+def index_gdt_files(gdt_paths, workers=None):
+    """Index the GDTs in parallel, one file per worker process at a time."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(index_gdt_file, gdt_paths))
+
+
+def find_cross_file_duplicates(file_entries, by_content=False):
+    """
+    Build a global (name, gdf) index over all files, and a content index too
+    when by_content is set. The first occurrence in path order is kept.
+
+    Returns (drop, duplicates): drop maps a path to the set of (name, gdf)
+    keys to remove from it, duplicates lists (path, name, gdf, kept_path,
+    kept_name) for each of them: header duplicates in another file than the
+    kept copy, and content aliases wherever they are.
+    """
+    headers = {}  # (name, gdf) -> path
+    contents = {}  # (gdf, digest) -> (path, name)
+    drop = {}
+    duplicates = []
+
+    for path in sorted(file_entries):
+        for name, gdf, digest in file_entries[path]:
+            key = (name, gdf)
+            if key in drop.get(path, ()):
+                continue
+
+            kept_path = headers.get(key)
+            if kept_path is not None:
+                # Repeats inside the kept file are removed by the per-file pass
+                if kept_path != path:
+                    drop.setdefault(path, set()).add(key)
+                    duplicates.append((path, name, gdf, kept_path, name))
+                continue
+
+            original = contents.get((gdf, digest)) if by_content else None
+            if original is not None:
+                drop.setdefault(path, set()).add(key)
+                duplicates.append((path, name, gdf, original[0], original[1]))
+                continue
+
+            headers[key] = path
+            contents.setdefault((gdf, digest), (path, name))
+
+    return drop, duplicates
+
+
+def drop_gdt_blocks(gdt_path, drop_keys):
+    """Remove the given keys and repeated headers from a GDT in place."""
+    seen = set()
+
+    def keep(block, chunk):
+        key = (block.name, block.gdf)
+        if key in drop_keys or key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    return gdt_path, filter_gdt(gdt_path, gdt_path, keep)
+
+
+def drop_gdt_blocks_in_files(drop, workers=None):
+    """Run drop_gdt_blocks over {path: keys} in parallel; returns {path: (kept, dropped)}."""
+    paths = sorted(drop)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(drop_gdt_blocks, paths, [drop[path] for path in paths]))
+
+
+# -------------------------
+# HEADER INDEX
+# -------------------------
+
+def build_gdt_index(gdt_path):
+    """Map (name, gdf) -> (offset, length) for every block; first one wins."""
+    index = {}
+    with open(gdt_path, "rb", buffering=READ_BUFFER) as f:
+        for block, _ in iter_gdt(f):
+            if block is not None:
+                index.setdefault((block.name, block.gdf), (block.start, block.end - block.start))
+    return index
+
+
+def save_gdt_index(gdt_path, index):
+    """Store the index next to the GDT, stamped with the GDT's mtime and size."""
+    stat = os.stat(gdt_path)
+    entries = {}
+    for (name, gdf), span in index.items():
+        entries.setdefault(gdf, {})[name] = list(span)
+
+    index_path = gdt_path + INDEX_SUFFIX
+    try:
+        with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "entries": entries}, f)
+        os.replace(index_path + ".tmp", index_path)
+    except OSError as e:
+        print(f"Could not save GDT index {index_path}: {e}")
+
+
+def load_gdt_index(gdt_path):
+    """
+    Return the header index for gdt_path, reusing the stored one while the
+    GDT's mtime and size are unchanged and rebuilding it otherwise.
+    """
+    stat = os.stat(gdt_path)
+    index_path = gdt_path + INDEX_SUFFIX
+
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored["mtime_ns"] == stat.st_mtime_ns and stored["size"] == stat.st_size:
+            return {
+                (name, gdf): tuple(span)
+                for gdf, entries in stored["entries"].items()
+                for name, span in entries.items()
+            }
+    except (OSError, ValueError, KeyError):
+        pass
+
+    print(f"Indexing {gdt_path}")
+    index = build_gdt_index(gdt_path)
+    save_gdt_index(gdt_path, index)
+    return index
+
+
+# -------------------------
+# IN-PLACE MERGE
+# -------------------------
+
+def _copy_range(src, dst, start, end):
+    src.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        buf = src.read(min(READ_BUFFER, remaining))
+        if not buf:
+            break
+        dst.write(buf)
+        remaining -= len(buf)
+
+
+def _closing_brace_offset(src, size, blocks_end=0):
+    """
+    Offset of the GDT's outer closing "}" (new blocks go before it), or size
+    if there is none. A final "}" before blocks_end, the end of the last
+    block, closes that block rather than a wrapper around the file.
+    """
+    tail_start = max(0, size - 4096)
+    src.seek(tail_start)
+    tail = src.read()
+    pos = tail.rfind(b"}")
+    if pos == -1 or tail[pos + 1:].strip():
+        return size
+    # Insert at the start of the brace's line so it stays on its own line
+    line_start = tail.rfind(b"\n", 0, pos) + 1
+    offset = tail_start + (line_start if line_start else pos)
+    return offset if offset >= blocks_end else size
+
+
+def _header_at(src, offset, key):
+    """Whether the line at offset is the header of block key."""
+    src.seek(offset)
+    return parse_header(src.readline()) == key
+
+
+def merge_gdt(gdt_path, blocks, index=None):
+    """
+    Write blocks into gdt_path itself: changed blocks are replaced where they
+    are and missing ones are added before the GDT's closing brace.
+
+    blocks maps (name, gdf) -> block text. Existing blocks are located with
+    the header index, untouched byte ranges are copied without reparsing and
+    the result replaces the GDT through a temp file and an atomic rename. The
+    stored index is updated from the known offsets instead of being rebuilt.
+
+    Returns (added, updated).
+    """
+    if index is None:
+        index = load_gdt_index(gdt_path)
+    size = os.path.getsize(gdt_path)
+
+    # mtime and size can miss an edit within one mtime tick; check the
+    # headers at every span about to be spliced, and at the last block
+    with open(gdt_path, "rb") as src:
+        checked = [key for key in blocks if key in index]
+        if index:
+            checked.append(max(index, key=lambda key: index[key][0]))
+        if not all(_header_at(src, index[key][0], key) for key in checked):
+            print(f"Index of {gdt_path} is out of date, rebuilding it")
+            index = build_gdt_index(gdt_path)
+            save_gdt_index(gdt_path, index)
+
+    with open(gdt_path, "rb") as src:
+        newline = b"\r\n" if src.readline().endswith(b"\r\n") else b"\n"
+
+        updates = []  # (offset, length, key, data)
+        additions = []  # (key, data)
+        for key, text in blocks.items():
+            data = text.encode("utf-8")
+            if newline != b"\n":
+                data = data.replace(b"\n", newline)
+
+            span = index.get(key)
+            if span is None:
+                additions.append((key, data))
+                continue
+
+            src.seek(span[0])
+            if normalize_block(src.read(span[1])) != normalize_block(data):
+                updates.append((span[0], span[1], key, data))
+
+        if not updates and not additions:
+            return 0, 0
+
+        updates.sort()
+        blocks_end = max((offset + length for offset, length in index.values()), default=0)
+        insert_at = _closing_brace_offset(src, size, blocks_end)
+        new_index = {}
+
+        tmp_path = gdt_path + ".tmp"
+        with open(tmp_path, "wb", buffering=READ_BUFFER) as dst:
+            pos = 0
+            for offset, length, key, data in updates:
+                _copy_range(src, dst, pos, offset)
+                new_index[key] = (dst.tell(), len(data))
+                dst.write(data)
+                pos = offset + length
+
+            _copy_range(src, dst, pos, insert_at)
+            src.seek(max(0, insert_at - 1))
+            if insert_at and src.read(1) not in (b"\n", b"{"):
+                dst.write(newline)
+            for key, data in additions:
+                new_index[key] = (dst.tell(), len(data))
+                dst.write(data)
+            _copy_range(src, dst, insert_at, size)
+
+    os.replace(tmp_path, gdt_path)
+
+    # Shift every untouched entry by the size change of the updates before it
+    shifts = []
+    delta = 0
+    for offset, length, key, data in updates:
+        delta += len(data) - length
+        shifts.append((offset, delta))
+    appended = sum(len(data) for _, data in additions)
+
+    shift_idx = 0
+    delta = 0
+    for key, (offset, length) in sorted(index.items(), key=lambda item: item[1][0]):
+        while shift_idx < len(shifts) and shifts[shift_idx][0] < offset:
+            delta = shifts[shift_idx][1]
+            shift_idx += 1
+        if key not in new_index:
+            new_index[key] = (offset + delta + (appended if offset >= insert_at else 0), length)
+
+    save_gdt_index(gdt_path, new_index)
+    return len(additions), len(updates)
+
+
+# -------------------------
+# TEMPLATES
+# -------------------------
+
+def _parse_template(text, nested):
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(text):
+        if literal:
+            parts.append((literal, None))
+        if field is None:
+            continue
+        if spec or conversion:
+            raise ValueError(f"Unsupported format spec in template field '{field}'")
+        if field in nested:
+            parts.extend(_parse_template(nested[field], {}))
+        else:
+            parts.append(("", field))
+    return parts
+
+
+def compile_template(text, **nested):
+    """
+    Compile a str.format template once into static chunks and field slots.
+
+    Keyword arguments splice other templates in place of a field, so
+    compile_template(MATERIAL_TEMPLATE, body=MATERIAL_BODY) renders the same
+    text as MATERIAL_TEMPLATE.format(body=MATERIAL_BODY.format(...)). All
+    spliced templates share one set of field values.
+
+    Returns (chunks, fields): chunks has one more entry than fields and
+    adjacent literals are merged.
+    """
+    chunks = [""]
+    fields = []
+    for literal, field in _parse_template(text, nested):
+        chunks[-1] += literal
+        if field is not None:
+            fields.append(field)
+            chunks.append("")
+    return tuple(chunks), tuple(fields)
+
+
+def render_template(compiled, values):
+    """Return the rendered pieces of a compiled template as a list of strings."""
+    chunks, fields = compiled
+    pieces = [chunks[0]]
+    for field, chunk in zip(fields, chunks[1:]):
+        pieces.append(values[field])
+        pieces.append(chunk)
+    return pieces
+
+
+def write_rendered(f, compiled, rows):
+    """Render every values dict in rows and write them with one writelines call."""
+    f.writelines(chain.from_iterable(render_template(compiled, values) for values in rows))
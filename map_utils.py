@@ -0,0 +1,355 @@
+# Writing Radiant .map files for the collision maps made by create_col_maps.py
+
+import mmap
+import os
+import re
+import time
+import uuid
+from collections import namedtuple
+
+WRITE_BUFFER = 1 << 20  # 1 MiB file buffer
+BRUSH_CHUNK = 4096  # Brushes formatted and written per batch
+GUID_BATCH = 4096  # Random GUIDs made per os.urandom call
+
+# Namespace for deterministic GUIDs; changing it changes every GUID in every map
+GUID_NAMESPACE = uuid.UUID("6f1d3c52-8a47-4e0b-9c1e-2b7a5d9e4f10")
+
+MAP_HEADER = '''iwmap 4
+"script_startingnumber" 0
+"000_Global" flags  active
+"The Map" flags expanded
+
+// entity 0
+{{
+guid "{guid}"
+"classname" "worldspawn"
+"fsi" "default"
+"gravity" "800"
+"lodbias" "default"
+"lutmaterial" "luts_t7_default"
+"numOmniShadowSlices" "24"
+"numSpotShadowSlices" "64"
+"sky_intensity_factor0" "1"
+"sky_intensity_factor1" "1"
+"state_alias_1" "State 1"
+"state_alias_2" "State 2"
+"state_alias_3" "State 3"
+"state_alias_4" "State 4"
+'''
+
+MAP_FOOTER = '''
+}}
+// entity 1
+{{
+guid "{guid}"
+"classname" "misc_model"
+"model" "{mesh_name}"
+"lightingstate1" "1"
+"lightingstate2" "1"
+"lightingstate3" "1"
+"lightingstate4" "1"
+"modelscale" "1"
+"static" "1"
+}}
+    '''
+
+
+# -------------------------
+# GUIDS
+# -------------------------
+
+def random_guids():
+    """Endless braced upper-case version 4 GUIDs, GUID_BATCH per os.urandom block."""
+    while True:
+        raw = bytearray(os.urandom(16 * GUID_BATCH))
+        # Version 4 and RFC 4122 variant bits, as uuid.uuid4() sets them
+        raw[6::16] = bytes((b & 0x0F) | 0x40 for b in raw[6::16])
+        raw[8::16] = bytes((b & 0x3F) | 0x80 for b in raw[8::16])
+
+        h = raw.hex().upper()
+        for off in range(0, len(h), 32):
+            yield f"{{{h[off:off + 8]}-{h[off + 8:off + 12]}-{h[off + 12:off + 16]}-{h[off + 16:off + 20]}-{h[off + 20:off + 32]}}}"
+
+
+def deterministic_guid(mesh_name, key):
+    """uuid5 of mesh_name and key, so the same brush always gets the same GUID."""
+    return f"{{{str(uuid.uuid5(GUID_NAMESPACE, f'{mesh_name}/{key}')).upper()}}}"
+
+
+def guid_provider(mesh_name, deterministic=False):
+    """
+    Return guid(key) for one map. Keys name the brush or entity (e.g.
+    "brush/12"); they only matter in deterministic mode, where unchanged
+    geometry then produces a byte-identical map.
+    """
+    if deterministic:
+        return lambda key: deterministic_guid(mesh_name, key)
+
+    guids = random_guids()
+    return lambda key: next(guids)
+
+
+# -------------------------
+# WRITING
+# -------------------------
+
+def format_triangle_brush(i, guid, corners, clip, lightmap):
+    """Text of the 5-plane brush for triangle i; corners are v1, v2, v3, v1e, v2e, v3e."""
+    v1, v2, v3, v1e, v2e, v3e = corners
+    return f"""
+// brush {i}
+{{
+ guid "{guid}"
+ ( {v1[0]} {v1[1]} {v1[2]} ) ( {v2[0]} {v2[1]} {v2[2]} ) ( {v3[0]} {v3[1]} {v3[2]} ) {clip} 64 64 0 0 0 0 {lightmap} 16 16 0 0 0 0
+ ( {v1e[0]} {v1e[1]} {v1e[2]} ) ( {v3e[0]} {v3e[1]} {v3e[2]} ) ( {v2e[0]} {v2e[1]} {v2e[2]} ) {clip} 64 64 0 0 0 0 {lightmap} 16 16 0 0 0 0
+ ( {v1[0]} {v1[1]} {v1[2]} ) ( {v1e[0]} {v1e[1]} {v1e[2]} ) ( {v2e[0]} {v2e[1]} {v2e[2]} ) {clip} 64 64 0 0 0 0 {lightmap} 16 16 0 0 0 0
+ ( {v2[0]} {v2[1]} {v2[2]} ) ( {v2e[0]} {v2e[1]} {v2e[2]} ) ( {v3e[0]} {v3e[1]} {v3e[2]} ) {clip} 64 64 0 0 0 0 {lightmap} 16 16 0 0 0 0
+ ( {v3[0]} {v3[1]} {v3[2]} ) ( {v3e[0]} {v3e[1]} {v3e[2]} ) ( {v1e[0]} {v1e[1]} {v1e[2]} ) {clip} 64 64 0 0 0 0 {lightmap} 16 16 0 0 0 0
+}}
+    """
+
+
+def format_brush(n, guid, planes, clip, lightmap):
+    """Text of a brush with any number of planes, each given as three points."""
+    faces = "".join(
+        f" ( {a[0]} {a[1]} {a[2]} ) ( {b[0]} {b[1]} {b[2]} ) ( {c[0]} {c[1]} {c[2]} ) {clip} 64 64 0 0 0 0 {lightmap} 16 16 0 0 0 0\n"
+        for a, b, c in planes
+    )
+    return f"""
+// brush {n}
+{{
+ guid "{guid}"
+{faces}}}
+    """
+
+
+def iter_brushes(brush_planes, clip, lightmap, guid):
+    """Yield brush text for each plane list, numbering the brushes from 0."""
+    for n, planes in enumerate(brush_planes):
+        yield format_brush(n, guid(f"brush/{n}"), planes, clip, lightmap)
+
+
+def iter_triangle_brushes(indices, corners, clip, lightmap, guid):
+    """
+    Yield brush text for each triangle index in indices.
+
+    corners is the (T, 6, 3) array of rounded corners; it is converted to
+    Python floats BRUSH_CHUNK brushes at a time so the text never piles up.
+    """
+    for start in range(0, len(indices), BRUSH_CHUNK):
+        chunk = indices[start:start + BRUSH_CHUNK]
+        for i, points in zip(chunk.tolist(), corners[chunk].tolist()):
+            yield format_triangle_brush(i, guid(f"brush/{i}"), points, clip, lightmap)
+
+
+def write_collision_map(filepath, mesh_name, brushes, guid):
+    """
+    Stream a collision map to filepath: the worldspawn entity holding the
+    brushes, then the misc_model entity for mesh_name. brushes is an
+    iterable of brush texts and guid a guid_provider() callable.
+    """
+    count = 0
+    with open(filepath, "w", buffering=WRITE_BUFFER) as f:
+        f.write(MAP_HEADER.format(guid=guid("entity/0")))
+
+        chunk = []
+        for brush in brushes:
+            chunk.append(brush)
+            if len(chunk) >= BRUSH_CHUNK:
+                f.writelines(chunk)
+                count += len(chunk)
+                chunk.clear()
+        f.writelines(chunk)
+        count += len(chunk)
+
+        f.write(MAP_FOOTER.format(guid=guid("entity/1"), mesh_name=mesh_name))
+
+    return count
+
+
+# -------------------------
+# READING / EDITING
+# -------------------------
+
+# "// brush N" / "// entity N" comment lines and the bare "}" closing a brush,
+# matched like line.strip() comparisons so results agree with remove_invalid_brushes.py
+COMMENT_RE = re.compile(rb"^[ \t]*// (brush|entity) (\d+)[ \t\r]*$", re.M)
+CLOSE_RE = re.compile(rb"^[ \t]*\}[ \t\r]*$\n?", re.M)
+
+# start/end are byte offsets: a brush runs from its comment line through the
+# line holding its closing "}", an entity from its comment to the next entity
+MapBrush = namedtuple("MapBrush", ["number", "entity", "start", "end"])
+MapEntity = namedtuple("MapEntity", ["number", "start", "end"])
+
+
+class MapFile:
+    """
+    A .map file, memory-mapped on first access. Entity and brush byte
+    ranges are indexed once, so brushes can be looked up, iterated and
+    removed/replaced without reading the whole file into memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._mm = None
+        self._entities = None
+        self._brushes = None
+        self._by_number = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+        self._file = self._mm = None
+        self._entities = self._brushes = self._by_number = None
+
+    @property
+    def data(self):
+        """The raw file contents (an mmap, or b"" for an empty file)."""
+        if self._mm is None:
+            self._file = open(self.path, "rb")
+            if os.fstat(self._file.fileno()).st_size == 0:
+                self._mm = b""
+            else:
+                self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def _index(self):
+        if self._brushes is not None:
+            return
+
+        data = self.data
+        entities = []
+        brushes = []
+        pos = 0
+        while True:
+            match = COMMENT_RE.search(data, pos)
+            if match is None:
+                break
+
+            kind, number = match.group(1), int(match.group(2))
+            if kind == b"entity":
+                if entities:
+                    entities[-1] = entities[-1]._replace(end=match.start())
+                entities.append(MapEntity(number, match.start(), len(data)))
+                pos = match.end()
+                continue
+
+            # Everything up to the next bare "}" line belongs to the brush
+            close = CLOSE_RE.search(data, match.end())
+            end = close.end() if close else len(data)
+            brushes.append(MapBrush(number, entities[-1].number if entities else None, match.start(), end))
+            pos = end
+
+        self._entities = entities
+        self._brushes = brushes
+        self._by_number = {}
+        for brush in brushes:
+            self._by_number.setdefault(brush.number, brush)
+
+    @property
+    def entities(self):
+        self._index()
+        return self._entities
+
+    @property
+    def brushes(self):
+        self._index()
+        return self._brushes
+
+    def __len__(self):
+        return len(self.brushes)
+
+    def brush(self, number):
+        """MapBrush for the first "// brush number" comment, or None."""
+        self._index()
+        return self._by_number.get(number)
+
+    def text(self, item):
+        """Decoded text of a MapBrush or MapEntity."""
+        return self.data[item.start:item.end].decode("utf-8")
+
+    def iter_brushes(self):
+        """Yield (MapBrush, text) pairs, reading each brush only when reached."""
+        for brush in self.brushes:
+            yield brush, self.text(brush)
+
+    def stats(self):
+        """Entity and brush counts, plus the smallest/largest brush in planes."""
+        planes = [self.data[b.start:b.end].count(b"(") // 3 for b in self.brushes]
+        return {
+            "entities": len(self.entities),
+            "brushes": len(planes),
+            "min_planes": min(planes, default=0),
+            "max_planes": max(planes, default=0),
+            "bytes": len(self.data),
+        }
+
+    def write(self, output_path=None, remove=(), replace=None, renumber=True):
+        """
+        Write the map to output_path (default: in place, through a temp file
+        and os.replace) without the brush numbers in remove and with the
+        texts in replace ({number: brush text from its comment line through
+        its closing "}"}) spliced in. Everything else
+        is copied byte for byte; with renumber the "// brush N" comments of
+        the kept brushes are numbered from 0 again.
+
+        Returns the list of brush numbers removed.
+        """
+        remove = set(remove)
+        replace = replace or {}
+        output_path = output_path or self.path
+        in_place = os.path.abspath(output_path) == os.path.abspath(self.path)
+        write_path = output_path + ".tmp" if in_place else output_path
+
+        data = self.data
+        removed = []
+        counter = 0
+        with open(write_path, "wb", buffering=WRITE_BUFFER) as dst:
+            pos = 0
+            for brush in self.brushes:
+                dst.write(data[pos:brush.start])
+                pos = brush.end
+
+                if brush.number in remove:
+                    removed.append(brush.number)
+                    continue
+
+                text = replace[brush.number].encode("utf-8") if brush.number in replace else data[brush.start:brush.end]
+                match = COMMENT_RE.search(text) if renumber else None
+                if match:
+                    text = text[:match.start(2)] + str(counter).encode("utf-8") + text[match.end(2):]
+                counter += 1
+                dst.write(text)
+
+            dst.write(data[pos:])
+
+        if in_place:
+            # The mapping has to go before the file can be replaced (Windows)
+            self.close()
+            os.replace(write_path, output_path)
+
+        return removed
+
+
+def remove_map_brushes(map_path, passes):
+    """
+    Drop brush numbers from map_path in place, renumbering the rest after
+    each pass (safe as a process pool worker). passes is a list of brush
+    number lists applied one after another, so each list numbers the
+    brushes as the previous pass left them. Returns (map_path, removed
+    brush numbers per pass, seconds).
+    """
+    start = time.perf_counter()
+    removed = []
+    for brushes_to_remove in passes:
+        with MapFile(map_path) as map_file:
+            removed.append(map_file.write(remove={int(brush) for brush in brushes_to_remove}))
+    return map_path, removed, time.perf_counter() - start
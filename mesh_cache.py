@@ -0,0 +1,128 @@
+# Blender-independent cache of mesh geometry written by extract_mesh_cache.py.
+#
+# Layout:
+#   <cache_dir>/manifest.json          per-mesh info (matrix, materials, array files)
+#   <cache_dir>/<mesh_name>/<array>.npy one uncompressed array per file
+#
+# Arrays are plain .npy files so they can be memory-mapped; loading a mesh
+# only reads the header until the data is actually touched. Each mesh also
+# records the .blend it was read from (path, mtime, size), so readers can
+# refuse geometry that is older than the .blend.
+
+import json
+import os
+
+import numpy as np
+
+MANIFEST_NAME = "manifest.json"
+
+
+def load_manifest(cache_dir):
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"meshes": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(path + ".tmp", path)
+
+
+def save_mesh(cache_dir, mesh_name, arrays, info, manifest):
+    """
+    Write one mesh: each entry of arrays becomes <mesh_name>/<key>.npy and
+    info (JSON-serializable) goes into manifest with the file list. The
+    manifest itself is written by save_manifest once all meshes are saved.
+    """
+    mesh_dir = os.path.join(cache_dir, mesh_name)
+    os.makedirs(mesh_dir, exist_ok=True)
+
+    files = {}
+    for key, array in arrays.items():
+        file_name = f"{key}.npy"
+        np.save(os.path.join(mesh_dir, file_name), np.ascontiguousarray(array))
+        files[key] = file_name
+
+    manifest["meshes"][mesh_name] = dict(info, arrays=files)
+
+
+def load_mesh(cache_dir, mesh_name, mmap=True, manifest=None):
+    """
+    Return (arrays, info) for one cached mesh. Arrays are memory-mapped
+    read-only unless mmap is False.
+    """
+    if manifest is None:
+        manifest = load_manifest(cache_dir)
+    info = manifest["meshes"].get(mesh_name)
+    if info is None:
+        raise KeyError(f"Mesh '{mesh_name}' is not in the cache at {cache_dir}")
+
+    mesh_dir = os.path.join(cache_dir, mesh_name)
+    arrays = {
+        key: np.load(os.path.join(mesh_dir, file_name), mmap_mode="r" if mmap else None)
+        for key, file_name in info["arrays"].items()
+    }
+    return arrays, info
+
+
+def world_vertices(arrays, info):
+    """(N, 3) float32 world-space vertices (meters) of a cached mesh, from its vertices and matrix_world."""
+    m = np.asarray(info["matrix_world"], dtype=np.float32)
+    return arrays["vertices"] @ m[:3, :3].T + m[:3, 3]
+
+
+# -------------------------
+# STALENESS
+# -------------------------
+
+def blend_state(blend_path):
+    """The "source" entry of a mesh read from blend_path: its path, mtime and size."""
+    stat = os.stat(blend_path)
+    return {"blend": os.path.abspath(blend_path), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def stale_meshes(manifest, mesh_names):
+    """
+    (mesh_name, reason) for each of mesh_names whose cached geometry may be
+    out of date: the .blend it was read from has changed (mtime or size) or
+    is gone, or the entry records no .blend at all.
+    """
+    stale = []
+    for mesh_name in mesh_names:
+        info = manifest["meshes"].get(mesh_name)
+        if info is None:
+            continue
+        source = info.get("source")
+        if not source:
+            stale.append((mesh_name, "no .blend recorded, cached by an older extract_mesh_cache.py"))
+            continue
+
+        try:
+            stat = os.stat(source["blend"])
+        except OSError:
+            stale.append((mesh_name, f"{source['blend']} no longer exists"))
+            continue
+        if stat.st_mtime_ns != source["mtime_ns"] or stat.st_size != source["size"]:
+            stale.append((mesh_name, f"{source['blend']} changed after it was cached"))
+    return stale
+
+
+def check_mesh_cache(manifest, mesh_names, allow_stale=False):
+    """
+    Raise if any of mesh_names is stale (see stale_meshes), or with
+    allow_stale only print a warning.
+    """
+    stale = stale_meshes(manifest, mesh_names)
+    if not stale:
+        return
+
+    for mesh_name, reason in stale:
+        print(f"Mesh cache out of date for '{mesh_name}': {reason}")
+    message = f"{len(stale)} of {len(mesh_names)} cached meshes are out of date; rerun extract_mesh_cache.py"
+    if not allow_stale:
+        raise Exception(message)
+    print(f"Warning: {message}")
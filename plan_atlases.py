@@ -0,0 +1,51 @@
+# Group small meshes into shared bake atlases, from the mesh cache written by
+# extract_mesh_cache.py; run with plain python before bake_single_texture.py:
+#   python plan_atlases.py
+
+import os
+import sys
+import json
+
+script_dir = os.path.dirname(os.path.realpath(__file__))
+if script_dir not in sys.path:
+    sys.path.append(script_dir)
+
+from bake_utils import plan_atlases, save_atlas_layout, surface_area
+from mesh_cache import check_mesh_cache, load_manifest, load_mesh, world_vertices
+
+json_path = os.path.join(script_dir, "data.json")
+
+with open(json_path, "r") as f:
+    data = json.load(f)
+
+mesh_names = data.get("mesh_names")
+mesh_cache_dir = data.get("mesh_cache_dir")
+# Plan from cached meshes whose .blend changed since extract_mesh_cache.py, with a warning
+allow_stale_mesh_cache = data.get("allow_stale_mesh_cache", False)
+bake_res = data.get("bake_res")
+bake_margin = data.get("bake_margin")
+# Written here, read by bake_single_texture.py, create_materials.py and write_for_gdt.py
+atlas_layout_path = data.get("atlas_layout_path")
+atlas_res = data.get("atlas_res", bake_res)
+atlas_texel_density = data.get("atlas_texel_density", 256)  # Pixels per meter
+atlas_padding = data.get("atlas_padding", 2 * bake_margin)  # Pixels between tiles
+atlas_prefix = data.get("atlas_prefix", "atlas")  # Atlas textures are <prefix>_<n>.tif; keep it unique per level
+
+manifest = load_manifest(mesh_cache_dir)
+for mesh_name in mesh_names:
+    if mesh_name not in manifest["meshes"]:
+        raise Exception(f"Mesh '{mesh_name}' not found.")
+check_mesh_cache(manifest, mesh_names, allow_stale_mesh_cache)
+
+areas = {}
+for mesh_name in mesh_names:
+    arrays, info = load_mesh(mesh_cache_dir, mesh_name, manifest=manifest)
+    areas[mesh_name] = surface_area(world_vertices(arrays, info), arrays["triangles"])
+
+layout = plan_atlases(areas, atlas_res, atlas_texel_density, atlas_padding, atlas_prefix)
+save_atlas_layout(atlas_layout_path, layout)
+
+print(f"{len(layout['meshes'])} of {len(mesh_names)} meshes packed into {len(layout['atlases'])} atlases of {atlas_res}px")
+for atlas_name, members in layout["atlases"].items():
+    print(f"{atlas_name}: {', '.join(members)}")
+print(f"Atlas layout written to {atlas_layout_path}")
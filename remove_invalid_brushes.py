@@ -1,8 +1,15 @@
 import os
+import sys
 import json
-import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 script_dir = os.path.dirname(os.path.realpath(__file__))
+if script_dir not in sys.path:
+    sys.path.append(script_dir)
+
+from map_utils import remove_map_brushes
+
 json_path = os.path.join(script_dir, "data.json")
 
 with open(json_path, "r") as f:
@@ -10,66 +17,57 @@ with open(json_path, "r") as f:
 
 coll_maps_dir = data.get("coll_maps_dir")
 invalid_brushes = data.get("invalid_brushes", [])
-
-
-def remove_brushes(text, brushes_to_remove):
-    lines = text.splitlines(keepends=True)
-    result = []
-    skip = False
-    brush_counter = 0  # Counter for relabeling brushes
-
-    for line in lines:
-        stripped = line.strip()
-
-        if not skip:
-            # Check if this line is the start of a brush we want to remove
-            remove_this_brush = False
-            for brush in brushes_to_remove:
-                if stripped == f"// brush {brush}":
-                    skip = True
-                    remove_this_brush = True
-                    print(f"Removing brush {brush}")
-                    break
-
-            if not remove_this_brush:
-                # Relabel brush lines
-                if stripped.startswith("// brush "):
-                    line = line.replace(stripped, f"// brush {brush_counter}")
-                    brush_counter += 1
-                result.append(line)
-        else:
-            # Skip lines until we hit the closing "}"
-            if stripped == "}":
-                skip = False
-                continue
-
-    return "".join(result)
-
-
-    
-
-
-for entry in invalid_brushes:
-    mesh = entry.get("mesh")
-    brushes_to_remove = entry.get("brushes", [])
-
-    if not mesh or not brushes_to_remove:
-        continue
-
-    map_path = os.path.join(coll_maps_dir, f"{mesh}.map")
-
-    if not os.path.exists(map_path):
-        print(f"Map not found: {map_path}")
-        continue
-
-    print(f"Processing: {map_path}")
-
-    with open(map_path, "r") as f:
-        text = f.read()
-
-    cleaned = remove_brushes(text, brushes_to_remove)
-
-    with open(map_path, "w") as f:
-        f.write(cleaned)
-
-    print(f"Saved cleaned file for {mesh}")
+# Clean the maps in parallel worker processes; None uses every core, 1 runs them one by one
+brush_workers = data.get("brush_workers", 1)
+
+
+def collect_jobs(invalid_brushes):
+    """
+    (map path, passes) per map with an existing file, plus messages for the
+    rest. Entries naming the same mesh become successive passes of one job,
+    in input order, so no two workers write the same map and each later
+    entry numbers the brushes as the earlier removal left them.
+    """
+    jobs = {}
+    log = []
+    for entry in invalid_brushes:
+        mesh = entry.get("mesh")
+        brushes_to_remove = entry.get("brushes", [])
+
+        if not mesh or not brushes_to_remove:
+            continue
+
+        map_path = os.path.join(coll_maps_dir, f"{mesh}.map")
+
+        if not os.path.exists(map_path):
+            log.append(f"Map not found: {map_path}")
+            continue
+
+        jobs.setdefault(map_path, []).append(brushes_to_remove)
+    return list(jobs.items()), log
+
+
+def remove_invalid_brushes(invalid_brushes, workers=1):
+    start = time.perf_counter()
+    jobs, log = collect_jobs(invalid_brushes)
+
+    if workers == 1:
+        results = [remove_map_brushes(map_path, passes) for map_path, passes in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(remove_map_brushes, *zip(*jobs))) if jobs else []
+
+    # One write for the whole report, so printing does not slow down big batches
+    total = 0
+    for map_path, removed, seconds in results:
+        count = sum(len(brushes) for brushes in removed)
+        # Later passes use the numbering left by the earlier ones
+        numbers = "; ".join(", ".join(map(str, brushes)) for brushes in removed)
+        log.append(f"{os.path.basename(map_path)}: removed {count} brushes in {seconds:.3f} s ({numbers})")
+        total += count
+    log.append(f"\nRemoved {total} brushes from {len(results)} maps ({time.perf_counter() - start:.2f} s)")
+    print("\n".join(log))
+
+
+if __name__ == "__main__":
+    remove_invalid_brushes(invalid_brushes, brush_workers)